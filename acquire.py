@@ -0,0 +1,83 @@
+import sys
+import time
+import asyncio
+import argparse
+
+import serial
+
+from arduino.acquisition import AcquisitionEngine
+from arduino.protocol import format_samples_csv
+
+# ============================================================
+# AKUISISI TANPA GUI
+# Rekam data alat e-nose langsung ke CSV (format sama dengan dataset):
+#   python acquire.py /dev/ttyACM0 --seconds 60 --output sample_data/uji.csv
+# Tanpa --output, sampel dicetak ke layar. Ctrl+C untuk berhenti lebih awal.
+# ============================================================
+
+# Header sama dengan MainPage.save_to_dataset
+HEADER = "MQ2;MQ3;MQ4;MQ6;MQ7;MQ8;MQ135;QCM;Temp;Hum;Pres"
+
+
+async def acquire(engine, seconds, out):
+    """Baca potongan sampel sampai `seconds` detik (None = tanpa batas). Mengembalikan jumlah sampel."""
+    count = 0
+    deadline = time.monotonic() + seconds if seconds else None
+
+    async def consume():
+        nonlocal count
+        async for timestamps, values in engine.batches():
+            for row in format_samples_csv(values, sep=';'):
+                out.write(row + "\n")
+            count += len(values)
+
+    try:
+        await asyncio.wait_for(consume(), None if deadline is None else deadline - time.monotonic())
+    except asyncio.TimeoutError:
+        pass
+    # Sisa sampel yang belum keluar sebagai potongan
+    batch = engine.take_pending()
+    if batch is not None:
+        for row in format_samples_csv(batch[1], sep=';'):
+            out.write(row + "\n")
+        count += len(batch[1])
+    return count
+
+
+async def run(args):
+    engine = AcquisitionEngine(args.port, args.baud, protocol=args.protocol,
+                               on_protocol=lambda mode: print(f"🔌 Protokol: {mode}", file=sys.stderr))
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        async with engine:
+            out.write(HEADER + "\n")
+            count = await acquire(engine, args.seconds, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    snap = engine.telemetry.snapshot()
+    print(f"✅ {count} sampel, {snap['bytes']} byte, gagal parse {snap['parse_errors']}, "
+          f"CRC gagal {snap['crc_errors']}, gap {snap['seq_gaps']}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rekam data alat e-nose tanpa GUI.")
+    parser.add_argument("port", help="Port serial, mis. /dev/ttyACM0 atau COM3")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--protocol", default="auto", choices=["auto", "ascii", "binary"])
+    parser.add_argument("--seconds", type=float, default=None, help="Lama rekam (default: sampai Ctrl+C)")
+    parser.add_argument("--output", default=None, help="File CSV tujuan (default: stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    except serial.SerialException as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
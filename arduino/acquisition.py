@@ -0,0 +1,271 @@
+import asyncio
+import time
+
+import serial
+import numpy as np
+
+from arduino.protocol import (FrameDecoder, LineSplitter, handshake_request, parse_handshake_ack, parse_line,
+                              MODE_ASCII, MODE_BINARY, MODE_AUTO)
+from arduino.telemetry import AcquisitionTelemetry, RateLimitedLog
+
+# ============================================================
+# MESIN AKUISISI ASYNCIO (TANPA QT)
+# Baca port serial non-blocking, decode ASCII / binary, kumpulkan sampel
+# per potongan (frame clock). Dipakai SerialWorker (adapter Qt) dan bisa
+# langsung dipakai skrip headless / benchmark:
+#
+#   async with AcquisitionEngine("/dev/ttyACM0") as engine:
+#       async for timestamps, values in engine.batches():
+#           ...
+#
+# Berhenti = cancel task yang sedang iterasi; tidak ada read yang memblokir.
+# ============================================================
+
+# Waktu tunggu balasan handshake. Arduino reset saat port dibuka (~2 detik bootloader),
+# jadi request dikirim ulang beberapa kali dalam rentang ini.
+HANDSHAKE_TIMEOUT = 3.0
+HANDSHAKE_RETRY = 0.5
+
+# Sampel dikirim per potongan, maksimal sekian kali per detik
+DEFAULT_FRAME_RATE = 30
+
+# Interval polling jika event loop tidak bisa menunggu fd (Windows / port tanpa fileno)
+POLL_INTERVAL = 0.005
+
+
+class AcquisitionEngine:
+    """
+    Akuisisi 1 alat di atas asyncio.
+
+    protocol:
+      - "auto"  : coba handshake binary, kalau firmware tidak membalas -> ASCII
+      - "ascii" : langsung ASCII (firmware lama)
+      - "binary": wajib binary: handshake seperti "auto", tapi jika firmware tidak
+                  membalas -> SerialException (bukan turun ke ASCII)
+    frame_rate: berapa kali per detik batches() mengeluarkan potongan sampel
+    on_protocol: callback(mode) saat protokol sudah dipilih
+    """
+
+    def __init__(self, port, baud_rate=9600, protocol=MODE_AUTO,
+                 frame_rate=DEFAULT_FRAME_RATE, on_protocol=None, log=print):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.protocol = protocol
+        self.frame_interval = 1.0 / frame_rate
+        self.on_protocol = on_protocol
+        self.mode = None
+        self.decoder = None
+        self.ser = None
+
+        # Counter akuisisi (dibaca UI lewat telemetry.snapshot()) + log per baris yang dibatasi
+        self.telemetry = AcquisitionTelemetry(port)
+        self.log = RateLimitedLog(f"DEBUG (Acquisition {port}): ", log=log)
+
+        self._splitter = LineSplitter()
+        self._handshake_deadline = None
+        self._next_request = 0.0
+        self._readable = None
+        self._loop = None
+        self._pending_t = []
+        self._pending_v = []
+
+    # --- Siklus hidup ---
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def open(self):
+        """Buka port (non-blocking: read tidak pernah menunggu data)."""
+        # Firmware selalu mulai di ASCII @ baud_rate; pindah ke binary hanya setelah "?BIN"
+        self.ser = serial.Serial(self.port, self.baud_rate, timeout=0)
+
+    async def connect(self, negotiate=True):
+        """Buka port (jika belum) dan daftarkan ke event loop; negotiate=True -> tunggu protokol dipilih."""
+        if self.ser is None:
+            self.open()
+        self._watch()
+        if negotiate:
+            await self.negotiate()
+        return self.mode
+
+    def close(self):
+        if self._readable is not None:
+            try:
+                self._loop.remove_reader(self.ser.fileno())
+            except Exception:
+                pass
+            self._readable = None
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+
+    def _watch(self):
+        """Daftarkan fd port ke event loop; jika tidak didukung, read() memakai polling."""
+        if self._readable is not None:
+            return
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        try:
+            loop.add_reader(self.ser.fileno(), readable.set)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            return
+        self._loop = loop
+        self._readable = readable
+
+    # --- Baca non-blocking ---
+    def _read_available(self):
+        # timeout=0: hanya ambil yang sudah ada. Port dicabut -> SerialException
+        try:
+            chunk = self.ser.read(self.ser.in_waiting or 1)
+        except OSError as e:
+            raise serial.SerialException(f"read failed: {e}") from e
+        self.telemetry.bytes += len(chunk)
+        return chunk
+
+    async def read(self, timeout=None):
+        """Tunggu bytes baru maksimal `timeout` detik (None = sampai ada). b'' jika timeout."""
+        # Selalu await (minimal 1 putaran event loop), supaya stream deras tidak memonopoli
+        # loop dan cancel() tetap bisa masuk
+        if self._readable is not None:
+            self._readable.clear()
+            try:
+                await asyncio.wait_for(self._readable.wait(), timeout)
+            except asyncio.TimeoutError:
+                return b''
+        else:
+            await asyncio.sleep(POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL))
+        return self._read_available()
+
+    # --- Protokol ---
+    async def negotiate(self):
+        """
+        Kirim "?BIN" sampai dapat "#BIN <baud>" atau timeout. Mengembalikan mode.
+        Baris data ASCII yang datang selama menunggu tetap dikumpulkan (tidak hilang).
+        """
+        while self.mode is None:
+            wait = self._handshake_tick()
+            if self.mode is None:
+                self._feed(await self.read(wait), time.monotonic())
+        return self.mode
+
+    def _handshake_tick(self):
+        """Kirim ulang "?BIN" jika waktunya. Mengembalikan detik sampai tick berikutnya."""
+        if self.protocol == MODE_ASCII:
+            self._set_mode(MODE_ASCII)
+            return None
+
+        now = time.monotonic()
+        if self._handshake_deadline is None:
+            self._handshake_deadline = now + HANDSHAKE_TIMEOUT
+        if now >= self._handshake_deadline:
+            if self.protocol == MODE_BINARY:
+                raise serial.SerialException(
+                    f"binary handshake failed: no '#BIN' reply to '?BIN' within {HANDSHAKE_TIMEOUT:.0f} s")
+            self._set_mode(MODE_ASCII)
+            return None
+        if now >= self._next_request:
+            self.ser.write(handshake_request())
+            self._next_request = now + HANDSHAKE_RETRY
+        return min(self._next_request, self._handshake_deadline) - now
+
+    def _set_mode(self, mode):
+        self.mode = mode
+        self.telemetry.protocol = mode
+        if mode == MODE_BINARY:
+            self.decoder = FrameDecoder()
+        if self.on_protocol is not None:
+            self.on_protocol(mode)
+
+    def _feed(self, chunk, timestamp):
+        if not chunk:
+            return
+        if self.mode == MODE_BINARY:
+            frames = self.decoder.feed(chunk)
+            for seq, values in frames:
+                self._push(timestamp, values)
+            self.telemetry.lines += len(frames)
+            self.telemetry.crc_errors = self.decoder.crc_errors
+            self.telemetry.seq_gaps = self.decoder.seq_gaps
+            return
+
+        lines = self._splitter.feed(chunk)
+        for i, raw_data in enumerate(lines):
+            if self.mode is None:
+                baud = parse_handshake_ack(raw_data.decode('utf-8', errors='replace').strip())
+                if baud is not None:
+                    if baud and baud != self.ser.baudrate:
+                        self.ser.flush()
+                        self.ser.baudrate = baud
+                    # Bytes setelah ACK sudah berupa frame binary
+                    rest = b'\n'.join(lines[i + 1:] + [bytes(self._splitter.buffer)])
+                    self._splitter = LineSplitter()
+                    self._set_mode(MODE_BINARY)
+                    self._feed(rest, timestamp)
+                    return
+            self._handle_ascii_line(raw_data, timestamp)
+
+    def _handle_ascii_line(self, raw_data, timestamp):
+        self.telemetry.lines += 1
+        try:
+            data = raw_data.decode('utf-8').strip()
+            if data:
+                # Kurang dari 11 nilai -> di-pad 0, lebih -> dipotong
+                values = parse_line(data)
+                if values is not None:
+                    self._push(timestamp, values)
+                else:
+                    self.telemetry.parse_errors += 1
+                    self.log('parse', f"Ignored non-CSV data: '{data}'")
+
+        except UnicodeDecodeError as e:
+            self.telemetry.decode_errors += 1
+            self.log('decode', f"UnicodeDecodeError for raw data: {raw_data!r} - {e}. Discarding.")
+        except Exception as e:
+            self.telemetry.parse_errors += 1
+            self.log('error', f"Unexpected error during data processing: {e}. Raw data: {raw_data!r}")
+
+    # --- Potongan sampel ---
+    def _push(self, timestamp, values):
+        self._pending_t.append(timestamp)
+        self._pending_v.append(values)
+        self.telemetry.samples += 1
+        self.telemetry.pending = len(self._pending_v)
+
+    def take_pending(self):
+        """Ambil sampel yang terkumpul: (timestamps (n,), values (n x 11)), atau None jika kosong."""
+        if not self._pending_v:
+            return None
+        batch = (np.array(self._pending_t, dtype=np.float64),
+                 np.array(self._pending_v, dtype=np.float64))
+        self._pending_t = []
+        self._pending_v = []
+        self.telemetry.batches_emitted += 1
+        self.telemetry.pending = 0
+        return batch
+
+    async def batches(self):
+        """
+        Async iterator potongan (timestamps float64 (n,), values float64 (n x 11)),
+        timestamp = time.monotonic() saat dibaca. Maksimal 1 potongan per frame_interval.
+        """
+        await self.connect(negotiate=False)
+        last_emit = 0.0
+        while True:
+            # Selama handshake berjalan, sampel ASCII tetap dikirim per potongan
+            wait = self._handshake_tick() if self.mode is None else None
+            if self._pending_v:
+                frame_wait = self.frame_interval - (time.monotonic() - last_emit)
+                if frame_wait <= 0:
+                    yield self.take_pending()
+                    last_emit = time.monotonic()
+                    continue
+                wait = frame_wait if wait is None else min(wait, frame_wait)
+            self._feed(await self.read(wait), time.monotonic())
+
+    async def samples(self):
+        """Async iterator per sampel: (timestamp, values (11,))."""
+        async for timestamps, values in self.batches():
+            for timestamp, row in zip(timestamps, values):
+                yield float(timestamp), row
@@ -0,0 +1,116 @@
+// ==================================================
+// E-NOSE BINARY STREAM FIRMWARE (HIGH-RATE)
+// ==================================================
+// Sama seperti realistic_sim.ino, tapi mendukung protokol binary:
+//   - Default: ASCII CSV 11 kolom @ 9600 baud, 2x per detik (kompatibel app lama)
+//   - Host kirim "?BIN"  -> balas "#BIN 115200", pindah ke frame binary @ 115200, 100 Hz
+//
+// Frame (50 byte, little-endian):
+//   [0xA5 0x5A] [seq uint16] [11 x float32] [crc16 uint16]
+//   CRC16-CCITT (poly 0x1021, init 0xFFFF) dihitung dari seq + payload.
+// Kontrol mode sampel tetap lewat '0' (Bersih) / '1' (Babi).
+
+#define NUM_VALUES 11
+#define ASCII_BAUD 9600
+#define BINARY_BAUD 115200
+#define ASCII_INTERVAL_MS 500
+#define BINARY_INTERVAL_MS 10
+
+int currentMode = 0;       // 0 = Udara Bersih, 1 = Daging Babi
+bool binaryMode = false;
+uint16_t seq = 0;
+unsigned long lastSend = 0;
+char cmdBuf[8];
+uint8_t cmdLen = 0;
+
+uint16_t crc16(const uint8_t *data, size_t len) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t b = 0; b < 8; b++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+void readSample(float *v) {
+  if (currentMode == 0) {
+    for (int i = 0; i < 8; i++) {
+      v[i] = 30.0 + (i * 2) + random(-200, 200) / 100.0;
+    }
+  } else {
+    const float base[8] = {150.0, 300.0, 120.0, 80.0, 90.0, 180.0, 550.0, 600.0};
+    const int noise[8] = {5, 10, 5, 5, 5, 5, 15, 20};
+    for (int i = 0; i < 8; i++) {
+      v[i] = base[i] + random(-noise[i], noise[i]);
+    }
+  }
+  v[8] = 28.5 + (random(-10, 10) / 100.0);    // Temp
+  v[9] = 65.0 + (random(-100, 100) / 100.0);  // Hum
+  v[10] = 1005.0 + (random(-10, 10) / 100.0); // Pres
+}
+
+void sendAscii(const float *v) {
+  for (int i = 0; i < NUM_VALUES; i++) {
+    Serial.print(v[i]);
+    if (i < NUM_VALUES - 1) Serial.print(',');
+  }
+  Serial.println();
+}
+
+void sendBinary(const float *v) {
+  uint8_t frame[2 + 2 + NUM_VALUES * 4 + 2];
+  frame[0] = 0xA5;
+  frame[1] = 0x5A;
+  frame[2] = seq & 0xFF;
+  frame[3] = seq >> 8;
+  memcpy(frame + 4, v, NUM_VALUES * 4); // AVR/ARM: float sudah little-endian
+  uint16_t crc = crc16(frame + 2, 2 + NUM_VALUES * 4);
+  frame[sizeof(frame) - 2] = crc & 0xFF;
+  frame[sizeof(frame) - 1] = crc >> 8;
+  Serial.write(frame, sizeof(frame));
+  seq++;
+}
+
+void handleCommand() {
+  while (Serial.available() > 0) {
+    char c = Serial.read();
+    if (c == '0') currentMode = 0;
+    if (c == '1') currentMode = 1;
+
+    if (c == '\n' || c == '\r') {
+      cmdBuf[cmdLen] = '\0';
+      if (!binaryMode && strcmp(cmdBuf, "?BIN") == 0) {
+        Serial.print("#BIN ");
+        Serial.println(BINARY_BAUD);
+        Serial.flush();
+        Serial.end();
+        Serial.begin(BINARY_BAUD);
+        binaryMode = true;
+        seq = 0;
+      }
+      cmdLen = 0;
+    } else if (cmdLen < sizeof(cmdBuf) - 1) {
+      cmdBuf[cmdLen++] = c;
+    }
+  }
+}
+
+void setup() {
+  Serial.begin(ASCII_BAUD);
+  randomSeed(analogRead(0));
+}
+
+void loop() {
+  handleCommand();
+
+  unsigned long interval = binaryMode ? BINARY_INTERVAL_MS : ASCII_INTERVAL_MS;
+  if (millis() - lastSend < interval) return;
+  lastSend = millis();
+
+  float values[NUM_VALUES];
+  readSample(values);
+  if (binaryMode) sendBinary(values);
+  else sendAscii(values);
+}
@@ -0,0 +1,188 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from arduino.serial_worker import SerialWorker
+from arduino.discovery import PortDiscovery, find_enose_ports
+from arduino.protocol import MODE_AUTO
+
+# Jeda reconnect setelah alat putus / gagal dibuka: mulai cepat (kabel goyang),
+# lalu dilipatgandakan sampai maksimum (port ada tapi alat tidak merespons)
+RECONNECT_MIN_DELAY = 0.1
+RECONNECT_MAX_DELAY = 5.0
+
+
+class DeviceManager(QObject):
+    """
+    Mengelola banyak alat sekaligus: 1 port = 1 SerialWorker (thread sendiri).
+    Semua sinyal diberi id perangkat (nama port) supaya UI bisa memisahkan
+    buffer per alat. Predictor tidak dikelola di sini (dipakai bersama di MainPage).
+
+    start_discovery(): port baru dibuka otomatis begitu muncul (PortDiscovery),
+    alat yang putus tapi port-nya masih ada dicoba lagi dengan jeda eksponensial.
+    """
+    samples_received = pyqtSignal(str, object, object) # (device, timestamps, values n x 11)
+    device_connected = pyqtSignal(str)
+    device_disconnected = pyqtSignal(str, str)         # (device, pesan)
+    protocol_selected = pyqtSignal(str, str)           # (device, "ascii"/"binary")
+    ports_changed = pyqtSignal(list)                   # Port e-nose yang terlihat discovery
+
+    def __init__(self, baud_rate=9600, protocol=MODE_AUTO, parent=None):
+        super().__init__(parent)
+        self.baud_rate = baud_rate
+        self.protocol = protocol
+        self.workers = {}   # port -> SerialWorker
+        self.connected = [] # Urutan port yang sudah terbuka
+        self._errors = {}
+
+        self.discovery = None
+        self.present = {}       # port -> fingerprint (dari discovery)
+        self._retry_delay = {}  # port -> jeda reconnect berikutnya (detik)
+        self._retry_timers = {} # port -> QTimer single-shot
+
+    # --- Discovery & reconnect ---
+    def start_discovery(self):
+        if self.discovery is not None:
+            return
+        self.discovery = PortDiscovery(parent=self)
+        self.discovery.port_added.connect(self._on_port_added)
+        self.discovery.port_removed.connect(self._on_port_removed)
+        self.discovery.ports_changed.connect(self.ports_changed)
+        self.discovery.start()
+
+    def stop_discovery(self):
+        if self.discovery is None:
+            return
+        self.discovery.stop()
+        self.discovery = None
+        self.present.clear()
+        for port in list(self._retry_timers):
+            self._cancel_retry(port)
+        self._retry_delay.clear()
+
+    def _on_port_added(self, port, fingerprint):
+        # Alat yang sama pindah nama port (misal ttyACM0 -> ttyACM1): lupakan port lama
+        for old, old_fingerprint in list(self.present.items()):
+            if old_fingerprint == fingerprint and old != port:
+                self._forget(old)
+        self.present[port] = fingerprint
+        self._cancel_retry(port)
+        self.open(port)
+
+    def _on_port_removed(self, port):
+        self._forget(port)
+        self.close(port, "Perangkat dicabut")
+
+    def _forget(self, port):
+        self.present.pop(port, None)
+        self._cancel_retry(port)
+        self._retry_delay.pop(port, None)
+
+    def _schedule_retry(self, port):
+        """Coba buka lagi `port` (jika masih terlihat discovery) setelah jeda eksponensial."""
+        if port not in self.present or port in self._retry_timers:
+            return
+        delay = self._retry_delay.get(port, RECONNECT_MIN_DELAY)
+        self._retry_delay[port] = min(delay * 2, RECONNECT_MAX_DELAY)
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(self._on_retry_due)
+        self._retry_timers[port] = timer
+        timer.start(int(delay * 1000))
+
+    def _cancel_retry(self, port):
+        timer = self._retry_timers.pop(port, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+
+    def _on_retry_due(self):
+        timer = self.sender()
+        for port, t in list(self._retry_timers.items()):
+            if t is timer:
+                self._cancel_retry(port)
+                if port in self.present:
+                    self.open(port)
+                break
+
+    def scan(self, ports=None):
+        """Buka semua port e-nose yang belum dibuka. Mengembalikan list port baru."""
+        if ports is None:
+            ports = find_enose_ports()
+        new_ports = [p for p in ports if p not in self.workers]
+        for port in new_ports:
+            self.open(port)
+        return new_ports
+
+    def open(self, port):
+        if port in self.workers:
+            return
+        worker = SerialWorker(port, self.baud_rate, protocol=self.protocol)
+        # Slot = method QObject ini (bukan lambda), supaya dieksekusi di thread GUI
+        worker.samples_received.connect(self._on_samples)
+        worker.connection_status.connect(self._on_status)
+        worker.error_occurred.connect(self._on_error)
+        worker.protocol_selected.connect(self._on_protocol)
+        self.workers[port] = worker
+        worker.start()
+
+    def close(self, port, message="Perangkat Terputus"):
+        worker = self.workers.pop(port, None)
+        if worker is None:
+            return
+        worker.stop()
+        if port in self.connected:
+            self.connected.remove(port)
+            self.device_disconnected.emit(port, self._errors.pop(port, message))
+
+    def close_all(self):
+        self.stop_discovery()
+        for port in list(self.workers):
+            self.close(port)
+
+    def is_connected(self):
+        return bool(self.connected)
+
+    def telemetry(self, port):
+        """Counter akuisisi milik alat `port` (None jika tidak ada)."""
+        worker = self.workers.get(port)
+        return worker.telemetry if worker is not None else None
+
+    def telemetry_snapshots(self):
+        return [self.workers[port].telemetry.snapshot() for port in self.connected if port in self.workers]
+
+    def _port_of_sender(self):
+        worker = self.sender()
+        return worker.port if worker is not None else None
+
+    def _on_samples(self, timestamps, values):
+        port = self._port_of_sender()
+        if port in self.workers:
+            self.samples_received.emit(port, timestamps, values)
+
+    def _on_status(self, status):
+        port = self._port_of_sender()
+        if port not in self.workers:
+            return
+        if status:
+            if port not in self.connected:
+                self.connected.append(port)
+                self.device_connected.emit(port)
+        else:
+            self.close(port)
+            self._schedule_retry(port)
+
+    def _on_error(self, message):
+        port = self._port_of_sender()
+        if port in self.workers:
+            self._errors[port] = f"Error: {message}"
+            if port not in self.connected:
+                # Gagal buka port -> lepas worker supaya bisa dicoba lagi saat scan berikutnya
+                self.workers.pop(port).wait()
+                self._errors.pop(port, None)
+                self._schedule_retry(port)
+
+    def _on_protocol(self, mode):
+        port = self._port_of_sender()
+        if port in self.workers:
+            # Alat benar-benar bicara (handshake selesai) -> reconnect berikutnya mulai cepat lagi
+            self._retry_delay.pop(port, None)
+            self.protocol_selected.emit(port, mode)
@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import serial.tools.list_ports
+
+# ============================================================
+# DISCOVERY PORT E-NOSE (THREAD LATAR)
+# Enumerasi port tidak pernah jalan di thread GUI.
+# Di Linux/macOS yang dipantau hanya mtime folder /dev (berubah saat node
+# ttyACM*/ttyUSB* dibuat/dihapus) + path ENOSE_EXTRA_PORTS; comports() yang
+# lambat baru dipanggil jika ada perubahan. Tanpa /dev (Windows) comports()
+# dipanggil berkala, tetap di thread ini.
+# ============================================================
+
+# USB-serial yang dipakai board e-nose (Arduino asli, CH340, FTDI, CP210x)
+ENOSE_USB_VIDS = {0x2341, 0x2A03, 0x1A86, 0x0403, 0x10C4}
+# Pola nama port USB-serial kalau VID tidak tersedia (misal pty / driver lama)
+ENOSE_PORT_PATTERNS = ("ttyACM", "ttyUSB", "usbmodem", "usbserial", "COM")
+
+WATCH_INTERVAL = 0.1      # Cek perubahan /dev & port tambahan (detik)
+FALLBACK_INTERVAL = 1.0   # Enumerasi penuh jika tidak ada /dev untuk dipantau
+FULL_SCAN_INTERVAL = 5.0  # Enumerasi penuh pengaman (event bisa terlewat)
+
+
+def is_enose_port(port_info):
+    if port_info.vid is not None:
+        return port_info.vid in ENOSE_USB_VIDS
+    name = os.path.basename(port_info.device)
+    return any(p in name for p in ENOSE_PORT_PATTERNS)
+
+
+def port_fingerprint(port_info):
+    """
+    Identitas alat yang tetap walau nama port berubah setelah dicolok ulang:
+    VID:PID:serial (atau lokasi USB) untuk USB, path asli untuk port lain.
+    """
+    if port_info.vid is not None:
+        ident = port_info.serial_number or port_info.location or ""
+        return f"{port_info.vid:04X}:{(port_info.pid or 0):04X}:{ident}"
+    return os.path.realpath(port_info.device)
+
+
+def extra_ports():
+    """Port tambahan dari env ENOSE_EXTRA_PORTS (dipisah os.pathsep), yang saat ini ada."""
+    ports = []
+    for extra in os.environ.get("ENOSE_EXTRA_PORTS", "").split(os.pathsep):
+        if extra and os.path.exists(extra) and extra not in ports:
+            ports.append(extra)
+    return ports
+
+
+def enumerate_enose_ports():
+    """Dict port -> fingerprint untuk semua port yang kemungkinan besar board e-nose."""
+    ports = {p.device: port_fingerprint(p) for p in serial.tools.list_ports.comports() if is_enose_port(p)}
+    for extra in extra_ports():
+        # Symlink (misal alat virtual) menunjuk ke pts baru setelah reconnect -> fingerprint berubah
+        ports.setdefault(extra, os.path.realpath(extra))
+    return ports
+
+
+def find_enose_ports():
+    """
+    Port yang kemungkinan besar board e-nose (bukan /dev/ttyS* bawaan motherboard).
+    Port tambahan (misal alat virtual) bisa didaftarkan lewat env ENOSE_EXTRA_PORTS,
+    dipisah dengan os.pathsep: ENOSE_EXTRA_PORTS=/tmp/ttyENOSE0:/tmp/ttyENOSE1
+    """
+    return list(enumerate_enose_ports())
+
+
+class PortDiscovery(QThread):
+    """
+    Pantau kedatangan / pencabutan alat di thread sendiri.
+    Port yang sudah ada saat start() dilaporkan sebagai port_added.
+    Port yang fingerprint-nya berubah (alat lain di path yang sama) dilaporkan
+    sebagai port_removed lalu port_added.
+    """
+    port_added = pyqtSignal(str, str)   # (port, fingerprint)
+    port_removed = pyqtSignal(str)
+    ports_changed = pyqtSignal(list)     # Setelah enumerasi pertama & setiap ada perubahan
+
+    def __init__(self, interval=WATCH_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.ports = {}
+        self._first_scan = True
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self._stop_event.clear()
+        self.ports = {}
+        self._first_scan = True
+        last_key = None
+        last_scan = 0.0
+        while not self._stop_event.is_set():
+            key = self._watch_key()
+            now = time.monotonic()
+            full_interval = FULL_SCAN_INTERVAL if key[0] is not None else FALLBACK_INTERVAL
+            if key != last_key or now - last_scan >= full_interval:
+                try:
+                    self._rescan()
+                except Exception as e:
+                    print(f"DEBUG (PortDiscovery): Enumerasi port gagal: {e}")
+                last_key = key
+                last_scan = now
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
+
+    def _watch_key(self):
+        """Tanda murah untuk 'mungkin ada port berubah' tanpa memanggil comports()."""
+        try:
+            dev_mtime = os.stat("/dev").st_mtime_ns
+        except OSError:
+            dev_mtime = None
+        return dev_mtime, tuple((p, os.path.realpath(p)) for p in extra_ports())
+
+    def _rescan(self):
+        current = enumerate_enose_ports()
+        changed = self._first_scan
+        self._first_scan = False
+        for port, fingerprint in list(self.ports.items()):
+            if current.get(port) != fingerprint:
+                del self.ports[port]
+                self.port_removed.emit(port)
+                changed = True
+        for port, fingerprint in current.items():
+            if port not in self.ports:
+                self.ports[port] = fingerprint
+                self.port_added.emit(port, fingerprint)
+                changed = True
+        if changed:
+            self.ports_changed.emit(list(self.ports))
@@ -0,0 +1,162 @@
+import struct
+import binascii
+
+import numpy as np
+
+# ==================================================
+# PROTOKOL SERIAL E-NOSE
+# ==================================================
+# 1. ASCII (firmware lama): 1 baris CSV per sampel, contoh
+#       "30.12,32.40,...,28.50,65.00,1005.00\n"
+#
+# 2. BINARY FRAME (firmware baru, lihat binary_stream.ino):
+#       [A5 5A] [seq uint16] [11 x float32] [crc16 uint16]   = 50 byte
+#    Semua little-endian. CRC16-CCITT (poly 0x1021, init 0xFFFF)
+#    dihitung dari seq + payload.
+#
+# Negosiasi saat connect:
+#    host  -> "?BIN\n"
+#    device-> "#BIN <baud>\n"   lalu device pindah ke binary + baud tsb
+#    Firmware lama tidak membalas -> host tetap di mode ASCII.
+#    (Request sengaja tanpa angka: firmware lama memakai '0'/'1'/'2'
+#     sebagai perintah ganti mode simulasi.)
+# ==================================================
+
+NUM_VALUES = 11
+SYNC = b'\xA5\x5A'
+FRAME_STRUCT = struct.Struct('<H%df' % NUM_VALUES)
+FRAME_SIZE = len(SYNC) + FRAME_STRUCT.size + 2
+
+HANDSHAKE_REQUEST = "?BIN"
+HANDSHAKE_ACK = "#BIN"
+
+MODE_ASCII = "ascii"
+MODE_BINARY = "binary"
+MODE_AUTO = "auto"
+
+
+def crc16(data):
+    """CRC16-CCITT (init 0xFFFF), sama dengan implementasi di firmware."""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(seq, values):
+    """Bangun 1 frame binary (dipakai firmware simulasi / virtual device / test)."""
+    vals = list(values)[:NUM_VALUES]
+    vals += [0.0] * (NUM_VALUES - len(vals))
+    body = FRAME_STRUCT.pack(seq & 0xFFFF, *vals)
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+def handshake_request():
+    return (HANDSHAKE_REQUEST + "\n").encode('ascii')
+
+
+def parse_handshake_ack(line):
+    """Kembalikan baud dari balasan "#BIN <baud>" (0 = baud tetap), atau None jika bukan ACK."""
+    if not line.startswith(HANDSHAKE_ACK):
+        return None
+    parts = line.split()
+    try:
+        return int(parts[1]) if len(parts) > 1 else 0
+    except ValueError:
+        return None
+
+
+class FrameDecoder:
+    """
+    Decoder stream binary: terima potongan bytes apa saja (feed),
+    keluarkan frame yang valid. Otomatis resync jika ada byte sampah / CRC salah.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.last_seq = None
+        self.crc_errors = 0
+        self.seq_gaps = 0       # Jumlah frame yang hilang (berdasarkan sequence)
+        self.bytes_skipped = 0
+
+    def feed(self, data):
+        """Mengembalikan list (seq, values_tuple)."""
+        self.buffer.extend(data)
+        frames = []
+        buf = self.buffer
+
+        while True:
+            start = buf.find(SYNC)
+            if start < 0:
+                # Simpan 1 byte terakhir (mungkin awal SYNC yang terpotong)
+                keep = 1 if buf[-1:] == SYNC[:1] else 0
+                self.bytes_skipped += len(buf) - keep
+                del buf[:len(buf) - keep]
+                break
+            if start:
+                self.bytes_skipped += start
+                del buf[:start]
+            if len(buf) < FRAME_SIZE:
+                break
+
+            body = bytes(buf[2:FRAME_SIZE - 2])
+            (crc,) = struct.unpack_from('<H', buf, FRAME_SIZE - 2)
+            if crc != crc16(body):
+                # Bukan frame valid -> geser 1 byte, cari SYNC berikutnya
+                self.crc_errors += 1
+                self.bytes_skipped += 1
+                del buf[:1]
+                continue
+
+            del buf[:FRAME_SIZE]
+            seq, *values = FRAME_STRUCT.unpack(body)
+            if self.last_seq is not None:
+                gap = (seq - self.last_seq - 1) & 0xFFFF
+                if gap and gap < 0x8000:
+                    self.seq_gaps += gap
+            self.last_seq = seq
+            frames.append((seq, values))
+
+        return frames
+
+
+class LineSplitter:
+    """Potong stream bytes jadi baris utuh; potongan baris terakhir disimpan untuk feed berikutnya."""
+
+    def __init__(self, max_line=1024):
+        self.buffer = bytearray()
+        self.max_line = max_line
+
+    def feed(self, data):
+        self.buffer.extend(data)
+        if b'\n' not in data:
+            if len(self.buffer) > self.max_line:
+                self.buffer.clear() # Sampah tanpa newline (misal salah baud)
+            return []
+        *lines, rest = self.buffer.split(b'\n')
+        self.buffer = bytearray(rest)
+        return lines
+
+
+def parse_line(line):
+    """
+    1 baris CSV ASCII -> array float64 (NUM_VALUES), di-pad 0 / dipotong.
+    Mengembalikan None jika baris bukan data sensor.
+    """
+    parts = line.split(',')
+    if len(parts) < 2:
+        return None
+    try:
+        parsed = np.array(parts[:NUM_VALUES], dtype=np.float64)
+    except ValueError:
+        return None
+    if len(parsed) == NUM_VALUES:
+        return parsed
+    values = np.zeros(NUM_VALUES, dtype=np.float64)
+    values[:len(parsed)] = parsed
+    return values
+
+
+def format_samples_csv(block, sep=","):
+    """Sampel (n x k) -> list baris CSV (format angka sama dengan firmware ASCII)."""
+    if len(block) == 0:
+        return []
+    fmt = sep.join(["%.2f"] * block.shape[1])
+    return [fmt % tuple(row) for row in np.asarray(block).tolist()]
@@ -1,48 +1,54 @@
+import asyncio
+
 import serial
 import serial.tools.list_ports
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from arduino.acquisition import AcquisitionEngine, DEFAULT_FRAME_RATE
+from arduino.protocol import MODE_AUTO
+
 class SerialWorker(QThread):
-    data_received = pyqtSignal(str)
+    """Adapter Qt di atas AcquisitionEngine: event loop asyncio di thread sendiri, hasil lewat sinyal."""
+    # (timestamps float64 (n,), values float64 (n x 11)), timestamp = time.monotonic() saat dibaca.
+    # Baris hanya di-parse sekali di engine; UI & predictor tidak pernah parse teks lagi.
+    samples_received = pyqtSignal(object, object)
     connection_status = pyqtSignal(bool)
     error_occurred = pyqtSignal(str)
+    protocol_selected = pyqtSignal(str) # "ascii" / "binary"
 
-    def __init__(self, port, baud_rate=9600):
+    def __init__(self, port, baud_rate=9600, protocol=MODE_AUTO, frame_rate=DEFAULT_FRAME_RATE):
+        """
+        protocol:
+          - "auto"  : coba handshake binary, kalau firmware tidak membalas -> ASCII
+          - "ascii" : langsung ASCII (firmware lama)
+          - "binary": wajib binary (handshake harus dibalas, jika tidak -> error_occurred)
+        frame_rate: berapa kali per detik potongan sampel dikirim ke GUI
+        """
         super().__init__()
         self.port = port
-        self.baud_rate = baud_rate
-        self.ser = None
+        self.engine = AcquisitionEngine(port, baud_rate, protocol=protocol,
+                                        frame_rate=frame_rate, on_protocol=self._on_protocol)
         self.running = True
+        self._loop = None
+        self._task = None
+
+    # Counter akuisisi (dibaca UI lewat telemetry.snapshot())
+    @property
+    def telemetry(self):
+        return self.engine.telemetry
+
+    @property
+    def mode(self):
+        return self.engine.mode
+
+    @property
+    def decoder(self):
+        return self.engine.decoder
 
     def run(self):
         print(f"DEBUG (SerialWorker): SerialWorker thread started for port {self.port}")
         try:
-            self.ser = serial.Serial(self.port, self.baud_rate, timeout=5)
-            self.connection_status.emit(True)
-            print(f"DEBUG (SerialWorker): Successfully opened serial port {self.port}")
-            while self.running:
-                # print(f"DEBUG (SerialWorker): Loop active. Attempting to read line...")
-                raw_data = self.ser.readline()
-                # print(f"DEBUG (SerialWorker): Raw data read: {raw_data!r}") # Too verbose in loop, uncomment if needed
-
-                if not raw_data: # If readline returns empty bytes (timeout), just continue
-                    continue
-
-                try:
-                    data = raw_data.decode('utf-8').strip()
-                    if data:
-                        # RELAXED VALIDATION: Accept almost anything for debugging purposes
-                        # Check if it at least contains a comma to be considered valid sensor data
-                        if ',' in data:
-                             print(f"DEBUG (SerialWorker): Data accepted: '{data}'")
-                             self.data_received.emit(data)
-                        else:
-                             print(f"DEBUG (SerialWorker): Ignored non-CSV data: '{data}'")
-                             
-                except UnicodeDecodeError as e:
-                    print(f"DEBUG (SerialWorker): UnicodeDecodeError for raw data: {raw_data!r} - {e}. Discarding.")
-                except Exception as e:
-                    print(f"DEBUG (SerialWorker): Unexpected error during data processing: {e}. Raw data: {raw_data!r}")
+            asyncio.run(self._main())
         except serial.SerialException as e:
             print(f"DEBUG (SerialWorker): Serial Error in run(): {e}")
             self.error_occurred.emit(f"Serial Error: {e}")
@@ -53,14 +59,44 @@ class SerialWorker(QThread):
             self.connection_status.emit(False)
         finally:
             print(f"DEBUG (SerialWorker): SerialWorker thread exiting for port {self.port}")
-            if self.ser and self.ser.is_open:
-                self.ser.close()
-                print(f"DEBUG (SerialWorker): Serial port {self.port} closed.")
             self.connection_status.emit(False) # This always emits False on exit
 
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        if not self.running:
+            return
+        engine = self.engine
+        try:
+            engine.open()
+            self.connection_status.emit(True)
+            print(f"DEBUG (SerialWorker): Successfully opened serial port {self.port}")
+            async for timestamps, values in engine.batches():
+                self.samples_received.emit(timestamps, values)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Sisa sampel yang belum terkirim tetap sampai ke GUI
+            batch = engine.take_pending()
+            if batch is not None:
+                self.samples_received.emit(*batch)
+            engine.close()
+            print(f"DEBUG (SerialWorker): Serial port {self.port} closed.")
+
+    def _on_protocol(self, mode):
+        print(f"DEBUG (SerialWorker): Protocol for {self.port}: {mode}")
+        self.protocol_selected.emit(mode)
+
     def stop(self):
         print(f"DEBUG (SerialWorker): Stop requested for {self.port}")
         self.running = False
+        # Cancel task akuisisi: read tidak pernah memblokir, jadi thread langsung selesai
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass # Event loop sudah ditutup
         self.wait() # Wait for the thread to finish
 
 def get_available_ports():
@@ -0,0 +1,121 @@
+import json
+import time
+from collections import deque
+
+# ============================================================
+# TELEMETRI AKUISISI
+# Counter ringan untuk jalur serial -> GUI. Ditulis dari thread serial,
+# dibaca dari thread GUI lewat snapshot() (cukup aman di bawah GIL:
+# hanya int/float yang ditambah, tidak ada struktur yang diubah bentuknya).
+# ============================================================
+
+LATENCY_WINDOW = 256  # Jumlah batch terakhir untuk statistik latensi
+RATE_WINDOW = 1.0     # Rate per detik dihitung ulang paling cepat tiap sekian detik
+
+
+class RateLimitedLog:
+    """
+    Pengganti print per baris: setiap key maksimal 1 pesan per `interval` detik.
+    Pesan yang ditahan dihitung dan dilaporkan di pesan berikutnya.
+    """
+
+    def __init__(self, prefix="", interval=5.0, log=print):
+        self.prefix = prefix
+        self.interval = interval
+        self.log = log
+        self._last = {}
+        self._suppressed = {}
+
+    def __call__(self, key, message):
+        now = time.monotonic()
+        if now - self._last.get(key, -self.interval) < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            message += f" (+{suppressed} pesan serupa ditahan)"
+        self._last[key] = now
+        self.log(f"{self.prefix}{message}")
+
+
+class AcquisitionTelemetry:
+    """
+    Counter per alat:
+      lines / bytes / samples      : total data masuk
+      decode_errors / parse_errors : baris bukan UTF-8 / bukan data sensor
+      crc_errors / seq_gaps        : khusus protokol binary
+      batches_emitted / painted    : selisihnya = antrian sinyal ke GUI (queue depth)
+      latency                      : waktu dari dibaca di thread serial sampai selesai digambar
+    """
+
+    COUNTERS = ('lines', 'bytes', 'samples', 'decode_errors', 'parse_errors',
+                'crc_errors', 'seq_gaps', 'batches_emitted', 'batches_painted')
+
+    def __init__(self, device=""):
+        self.device = device
+        self.started = time.monotonic()
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.pending = 0        # Sampel yang belum dikirim ke GUI (di buffer worker)
+        self.protocol = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._latency_max = 0.0
+        self._last_rates = (self.started, 0, 0, 0)
+        self._rates = (0.0, 0.0, 0.0)
+
+    def record_paint(self, timestamps):
+        """Dipanggil GUI setelah 1 batch digambar. timestamps = waktu baca tiap sampel."""
+        self.batches_painted += 1
+        if len(timestamps) == 0:
+            return
+        # Sampel tertua di batch = latensi terburuk
+        latency = time.monotonic() - float(timestamps[0])
+        self._latencies.append(latency)
+        self._latency_max = max(self._latency_max, latency)
+
+    def snapshot(self):
+        """Dict counter + rate per detik (rata-rata ~RATE_WINDOW detik terakhir)."""
+        now = time.monotonic()
+        t0, lines0, bytes0, samples0 = self._last_rates
+        dt = now - t0
+        if dt >= RATE_WINDOW or not any(self._rates):
+            dt = max(dt, 1e-9)
+            self._rates = ((self.lines - lines0) / dt, (self.bytes - bytes0) / dt, (self.samples - samples0) / dt)
+            self._last_rates = (now, self.lines, self.bytes, self.samples)
+        lines_rate, bytes_rate, samples_rate = self._rates
+
+        snap = {name: getattr(self, name) for name in self.COUNTERS}
+        snap.update({
+            'device': self.device,
+            'protocol': self.protocol,
+            'uptime_s': round(now - self.started, 3),
+            'lines_per_s': round(lines_rate, 1),
+            'bytes_per_s': round(bytes_rate, 1),
+            'samples_per_s': round(samples_rate, 1),
+            'queue_depth': max(self.batches_emitted - self.batches_painted, 0),
+            'pending_samples': self.pending,
+        })
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            snap['latency_ms'] = {
+                'mean': round(1000 * sum(ordered) / len(ordered), 2),
+                'p95': round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 2),
+                'max': round(1000 * self._latency_max, 2),
+            }
+        return snap
+
+    def summary(self, snap=None):
+        """1 baris ringkas untuk label status."""
+        snap = snap or self.snapshot()
+        errors = snap['decode_errors'] + snap['parse_errors'] + snap['crc_errors']
+        text = (f"{snap['samples_per_s']:.0f} sampel/s · {snap['bytes_per_s'] / 1024:.1f} kB/s · "
+                f"gagal {errors} · gap {snap['seq_gaps']} · antrian {snap['queue_depth']}")
+        if 'latency_ms' in snap:
+            text += f" · latensi {snap['latency_ms']['mean']:.0f} ms"
+        return text
+
+
+def dump_telemetry(path, snapshots):
+    """Simpan snapshot telemetri (list dict) ke file JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'devices': snapshots}, f, indent=2)
@@ -0,0 +1,272 @@
+import os
+import pty
+import tty
+import glob
+import time
+import errno
+import random
+import threading
+
+import numpy as np
+
+from arduino.protocol import NUM_VALUES, HANDSHAKE_REQUEST, encode_frame, format_samples_csv
+
+# ============================================================
+# VIRTUAL E-NOSE (PSEUDO-TERMINAL)
+# Alat palsu di /dev/pts/N yang bicara persis seperti firmware:
+# CSV ASCII, atau frame binary setelah handshake "?BIN".
+# Dipakai untuk uji beban SerialWorker tanpa Arduino (lihat virtual_device.py di root).
+# ============================================================
+
+CHANNELS = ['MQ2', 'MQ3', 'MQ4', 'MQ6', 'MQ7', 'MQ8', 'MQ135', 'QCM', 'TEMP', 'HUM', 'PRES']
+# Nilai lingkungan jika rekaman tidak punya kolom Temp/Hum/Pres
+DEFAULT_ENV = [28.5, 65.0, 1005.0]
+# Keterlambatan jadwal kirim maksimum sebelum jadwal di-reset (detik)
+MAX_BACKLOG = 0.05
+
+# Profil sintetis (nilai dasar 8 sensor, noise), sama dengan realistic_sim.ino
+SYNTHETIC_PROFILES = {
+    'bersih': ([30.0 + i * 2 for i in range(8)], 2.0),
+    'biomarker': ([150.0, 300.0, 120.0, 80.0, 90.0, 180.0, 550.0, 600.0], 10.0),
+}
+
+
+def recording_source(data_path, loop=True, log=print):
+    """
+    Generator sampel (array 11 nilai) dari rekaman CSV di data_path (folder / glob / file).
+    Kolom yang tidak ada diisi 0 (sensor) atau nilai default (lingkungan).
+    """
+    from ml.dataset_loader import read_sensor_csv
+    from ml.feature_extractor import dataframe_to_array
+
+    if os.path.isdir(data_path):
+        paths = sorted(glob.glob(os.path.join(data_path, "**", "*.csv"), recursive=True))
+    else:
+        paths = sorted(glob.glob(data_path))
+    if not paths:
+        raise ValueError(f"Tidak ada file CSV di {data_path}")
+
+    while True:
+        for path in paths:
+            try:
+                # Koma desimal ("0,9605") & NaN ditangani dataframe_to_array
+                df = read_sensor_csv(path)
+                block, present = dataframe_to_array(df, CHANNELS)
+            except Exception as e:
+                log(f"⚠️ Lewati {path}: {e}")
+                continue
+            for j in range(8, NUM_VALUES):
+                if not present[j]:
+                    block[:, j] = DEFAULT_ENV[j - 8]
+            yield from block
+        if not loop:
+            return
+
+
+def synthetic_source(profile='bersih', seed=None):
+    """Generator sampel sintetis tanpa akhir ('bersih' / 'biomarker' / 'acak')."""
+    rng = np.random.default_rng(seed)
+    while True:
+        if profile == 'acak':
+            base, noise = rng.uniform(0, 600, 8), 50.0
+        else:
+            base, noise = SYNTHETIC_PROFILES[profile]
+        sample = np.empty(NUM_VALUES, dtype=np.float64)
+        sample[:8] = np.asarray(base) + rng.uniform(-noise, noise, 8)
+        sample[8:] = np.asarray(DEFAULT_ENV) + rng.uniform(-0.1, 0.1, 3)
+        yield sample
+
+
+class VirtualDevice:
+    """
+    Alat e-nose virtual di atas pseudo-terminal.
+
+      dev = VirtualDevice(synthetic_source('biomarker'), rate_hz=500, corrupt_rate=0.01)
+      dev.start()
+      SerialWorker(dev.port).start()   # atau DeviceManager.scan([dev.port])
+      ...
+      dev.stop(); print(dev.stats)
+
+    Parameter:
+      - rate_hz          : sampel per detik (10 - 1000+)
+      - jitter           : simpangan jadwal kirim, fraksi dari periode (0.2 = +-20%)
+      - corrupt_rate     : peluang 1 sampel dikirim rusak (baris terpotong / byte frame terbalik)
+      - disconnect_every : putus koneksi tiap N detik (None = tidak pernah)
+      - disconnect_for   : lama putus sebelum alat "dicolok" lagi (port pts baru)
+      - binary           : False = meniru firmware lama (abaikan "?BIN")
+      - link             : path symlink tetap ke port aktif (misal /tmp/ttyENOSE0),
+                           berguna karena nama /dev/pts/N berubah setiap reconnect
+    """
+
+    def __init__(self, source, rate_hz=10.0, jitter=0.0, corrupt_rate=0.0,
+                 disconnect_every=None, disconnect_for=2.0, binary=True, link=None, seed=None):
+        self.source = iter(source)
+        self.rate_hz = float(rate_hz)
+        self.jitter = jitter
+        self.corrupt_rate = corrupt_rate
+        self.disconnect_every = disconnect_every
+        self.disconnect_for = disconnect_for
+        self.binary = binary
+        self.link = link
+        self.rng = random.Random(seed)
+
+        self.port = None
+        self.mode = 'ascii'
+        self.stats = {'sent': 0, 'corrupted': 0, 'dropped': 0, 'bytes': 0, 'disconnects': 0}
+        self._master = None
+        self._slave = None
+        self._thread = None
+        self._running = False
+        self._paused = False
+        self._seq = 0
+
+    # --- Siklus hidup ---
+    def start(self):
+        self._open_pty()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="virtual-enose", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        self._close_pty()
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+
+    def pause(self):
+        """Berhenti kirim sampel (perintah dari host tetap dilayani)."""
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def _open_pty(self):
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave) # Tanpa echo / konversi newline, seperti port serial asli
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+        self.mode = 'ascii' # Alat baru "boot" selalu di mode ASCII
+        if self.link:
+            tmp = self.link + ".tmp"
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            os.symlink(self.port, tmp)
+            os.replace(tmp, self.link)
+
+    def _close_pty(self):
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+
+    # --- Loop pengirim ---
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_send = time.monotonic()
+        next_disconnect = time.monotonic() + self.disconnect_every if self.disconnect_every else None
+        rx = bytearray()
+
+        while self._running:
+            now = time.monotonic()
+
+            if next_disconnect and now >= next_disconnect:
+                self._simulate_disconnect()
+                if not self._running:
+                    break
+                now = time.monotonic()
+                next_send = now
+                next_disconnect = now + self.disconnect_every
+                rx.clear()
+
+            rx.extend(self._read_host())
+            if b'\n' in rx:
+                *lines, rest = rx.split(b'\n')
+                rx = bytearray(rest)
+                for line in lines:
+                    self._handle_command(line.strip().decode('ascii', errors='replace'))
+
+            if self._paused:
+                next_send = now
+                time.sleep(0.01)
+                continue
+
+            # Kirim semua sampel yang sudah jatuh tempo (mengejar jika terlambat)
+            while next_send <= now and self._running:
+                try:
+                    sample = next(self.source)
+                except StopIteration:
+                    self._running = False
+                    break
+                self._send(sample)
+                jitter = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+                next_send += period * (1.0 + jitter)
+
+            # Tertinggal jauh (misal baca CSV berikutnya lambat) -> jangan kirim borongan,
+            # alat asli juga tidak "mengejar" sampel yang terlewat
+            if time.monotonic() - next_send > MAX_BACKLOG:
+                next_send = time.monotonic()
+
+            time.sleep(max(0.0, min(next_send - time.monotonic(), 0.01)))
+
+    def _read_host(self):
+        try:
+            return os.read(self._master, 256)
+        except (BlockingIOError, OSError):
+            return b''
+
+    def _handle_command(self, line):
+        if self.binary and line == HANDSHAKE_REQUEST and self.mode == 'ascii':
+            # Baud 0 = tidak perlu ganti baud (pty tidak punya baud nyata)
+            self._write(b"#BIN 0\n")
+            self.mode = 'binary'
+            self._seq = 0
+
+    def _send(self, sample):
+        if self.mode == 'binary':
+            data = bytearray(encode_frame(self._seq, sample))
+            self._seq = (self._seq + 1) & 0xFFFF
+        else:
+            data = bytearray((format_samples_csv(np.asarray(sample)[np.newaxis, :])[0] + "\n").encode('ascii'))
+
+        if self.corrupt_rate and self.rng.random() < self.corrupt_rate:
+            self.stats['corrupted'] += 1
+            if self.mode == 'binary':
+                data[self.rng.randrange(2, len(data))] ^= 0xFF # Gagal CRC
+            else:
+                data = data[:self.rng.randrange(1, len(data) - 1)] + b"#\n" # Baris terpotong
+
+        if self._write(bytes(data)):
+            self.stats['sent'] += 1
+
+    def _write(self, data):
+        """Tulis non-blocking. Buffer pty penuh (host lambat) = sampel hilang, seperti UART tanpa flow control."""
+        try:
+            written = os.write(self._master, data)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                self.stats['dropped'] += 1
+                return False
+            raise
+        self.stats['bytes'] += written
+        if written < len(data):
+            self.stats['dropped'] += 1
+            return False
+        return True
+
+    def _simulate_disconnect(self):
+        self.stats['disconnects'] += 1
+        self._close_pty()
+        # Jika link dipakai, hapus dulu supaya host melihat alat "dicabut"
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+        deadline = time.monotonic() + self.disconnect_for
+        while self._running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self._running:
+            self._open_pty()
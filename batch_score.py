@@ -0,0 +1,122 @@
+import os
+import sys
+import glob
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# CATATAN: file ini sengaja TIDAK meng-import PyQt sama sekali,
+# supaya bisa dijalankan di server / CI tanpa GUI.
+from ml.predictor import Predictor
+from ml.feature_extractor import DEFAULT_SENSORS, feature_columns
+from ml.dataset_loader import iter_load_recordings, default_workers
+from ml.packed_dataset import PackedDataset, PACKED_EXT
+
+# ============================================================
+# BATCH SCORER (HEADLESS)
+# Contoh:
+#   python batch_score.py "Data Uji" -o hasil.csv
+#   python batch_score.py "sample_data/Etanol/*.csv" --models SVM.joblib,XGBoost.joblib -o hasil.parquet
+#   python batch_score.py sample_data/dataset.enpk -o hasil.csv
+# ============================================================
+
+
+def collect_inputs(patterns):
+    """Folder (dicari *.csv rekursif), glob, file .csv, atau file .enpk."""
+    csv_files, packed_files = [], []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "**", "*.csv"), recursive=True))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if path.endswith(PACKED_EXT):
+                packed_files.append(path)
+            else:
+                csv_files.append(path)
+    return csv_files, packed_files
+
+
+def build_table(names, results, errors):
+    """Tabel hasil: 1 baris per rekaman + kolom vote per model."""
+    rows = []
+    for name, (label, conf, votes), err in zip(names, results, errors):
+        row = {'file': name, 'label': label, 'confidence': round(float(conf), 2), 'error': err or ''}
+        if votes:
+            winner_count = sum(1 for v in votes if v['label'] == label)
+            row['agreement'] = round(winner_count / len(votes), 3)
+        for v in votes:
+            row[f"{v['name']}_label"] = v['label']
+            row[f"{v['name']}_conf"] = round(float(v['conf']), 2)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skoring massal rekaman E-Nose tanpa GUI.")
+    parser.add_argument("inputs", nargs="+", help="Folder, glob, file .csv, atau file .enpk")
+    parser.add_argument("-o", "--output", default="batch_results.csv", help="File hasil (.csv atau .parquet)")
+    parser.add_argument("-m", "--models", default=None, help="Whitelist model, pisahkan dengan koma (default: semua)")
+    parser.add_argument("--model-dir", default=Predictor.MODEL_DIR, help="Folder model .joblib")
+    parser.add_argument("-j", "--workers", type=int, default=default_workers(), help="Jumlah proses paralel untuk baca CSV")
+    args = parser.parse_args(argv)
+
+    whitelist = [m.strip() for m in args.models.split(',')] if args.models else None
+    if whitelist:
+        whitelist = [m if m.endswith('.joblib') else m + '.joblib' for m in whitelist]
+
+    predictor = Predictor()
+    predictor.MODEL_DIR = args.model_dir
+    models = predictor._get_model_list(whitelist)
+    if not models:
+        print(f"❌ Tidak ada model di '{args.model_dir}'" + (f" yang cocok dengan {whitelist}" if whitelist else ""))
+        return 1
+    print(f"🤖 {len(models)} model: {', '.join(models)}")
+
+    csv_files, packed_files = collect_inputs(args.inputs)
+    if not csv_files and not packed_files:
+        print("❌ Tidak ada rekaman ditemukan.")
+        return 1
+
+    columns = feature_columns()
+    names, errors, rows = [], [], []
+
+    # 1. CSV: baca + ekstraksi fitur paralel (process pool)
+    if csv_files:
+        print(f"📂 Membaca {len(csv_files)} file CSV ({args.workers} proses)...")
+        for result in iter_load_recordings(csv_files, DEFAULT_SENSORS, workers=args.workers):
+            names.append(result['path'])
+            errors.append(result['error'])
+            rows.append(result['features'] if not result['error'] else np.full(len(columns), np.nan))
+
+    # 2. Dataset packed
+    for packed_path in packed_files:
+        ds = PackedDataset(packed_path)
+        print(f"📦 {packed_path}: {len(ds)} rekaman")
+        X_part, _ = ds.extract_features(DEFAULT_SENSORS)
+        for i in range(len(ds)):
+            names.append(f"{packed_path}:{ds.meta[i].get('source', i)}")
+            errors.append(None)
+            rows.append(X_part[i])
+
+    # 3. Skoring: setiap model dipanggil sekali untuk seluruh matriks
+    X = np.vstack(rows) if rows else np.empty((0, len(columns)))
+    ok = np.array([e is None for e in errors], dtype=bool)
+    results = [("Gagal Baca", 0.0, [])] * len(names)
+    for i, res in zip(np.flatnonzero(ok), predictor.predict_features(X[ok], columns, whitelist)):
+        results[i] = res
+
+    table = build_table(names, results, errors)
+    if args.output.endswith('.parquet'):
+        table.to_parquet(args.output, index=False)
+    else:
+        table.to_csv(args.output, index=False)
+
+    print(f"✅ {int(ok.sum())} rekaman diskor, {int((~ok).sum())} gagal. Hasil: {args.output}")
+    print(table['label'].value_counts().to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import io
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ml.feature_extractor import dataframe_to_array, extract_feature_vector
+
+
+def read_sensor_csv(source):
+    """
+    Baca 1 file CSV rekaman sensor (path atau isi file dalam bytes).
+    Coba separator titik koma (;) dulu, jika kolom menyatu coba koma (,).
+    Header dinormalisasi ('MQ 3' -> 'MQ3').
+    Raise ValueError jika format tidak dikenali.
+    """
+    def _open():
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    df = pd.read_csv(_open(), sep=';', decimal=',')
+
+    # Jika gagal (kolom nyatu), coba Separator Koma (,)
+    if df.shape[1] < 3:
+        df_comma = pd.read_csv(_open(), sep=',', decimal='.')
+        if df_comma.shape[1] >= 3:
+            df = df_comma
+
+    if df.shape[1] < 3:
+        raise ValueError(f"Format kolom tidak dikenali ({df.shape[1]} kolom)")
+
+    df.columns = df.columns.str.strip().str.upper().str.replace(' ', '')
+    return df
+
+
+# Variasi nama kolom lingkungan di file lama (urutan = prioritas)
+ENV_ALIASES = (
+    ('TEMP', 'TEMPERATURE', 'SUHU'),
+    ('HUM', 'HUMIDITY', 'KELEMBABAN'),
+    ('PRES', 'PRESSURE', 'TEKANAN'),
+)
+
+
+def recording_arrays(df, active_sensors=None):
+    """
+    DataFrame rekaman -> (sensor n x n_sensor, env n x 3 [Temp, Hum, Pres]).
+    Dipetakan per kolom (vektor), bukan per baris. Kolom yang tidak ada = 0.
+    """
+    columns = {str(c).upper().strip().replace(' ', '') for c in df.columns}
+    env_names = [next((a for a in aliases if a in columns), aliases[0]) for aliases in ENV_ALIASES]
+    values, _ = dataframe_to_array(df, active_sensors)
+    env, _ = dataframe_to_array(df, env_names)
+    return values, env
+
+
+def load_recording(path, active_sensors=None):
+    """
+    Worker untuk 1 file: baca CSV + ekstraksi fitur (vektor).
+    Dijalankan di proses terpisah, jadi TIDAK BOLEH raise:
+    error dikembalikan sebagai string supaya bisa dilaporkan ke user.
+    """
+    result = {'path': path, 'features': None, 'columns': None, 'sha1': None, 'error': None}
+    try:
+        # Baca bytes sekali: dipakai untuk hash isi (cache) dan parsing
+        with open(path, 'rb') as f:
+            raw = f.read()
+        result['sha1'] = hashlib.sha1(raw).hexdigest()
+
+        df = read_sensor_csv(raw)
+        values, present = dataframe_to_array(df, active_sensors)
+        result['columns'] = df.columns.tolist()
+        result['features'] = extract_feature_vector(values, present, active_sensors)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def load_raw_recording(path):
+    """
+    Worker untuk 1 file: baca CSV jadi array float32 mentah (semua kolom),
+    tanpa ekstraksi fitur. Dipakai untuk import ke format packed.
+    """
+    result = {'path': path, 'values': None, 'columns': None, 'error': None}
+    try:
+        df = read_sensor_csv(path)
+        columns = df.columns.tolist()
+        values, _ = dataframe_to_array(df, columns)
+        result['columns'] = columns
+        result['values'] = values.astype(np.float32)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _call(job):
+    fn, args = job
+    return fn(*args)
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1))
+
+
+def _iter_pool(fn, arg_list, workers=None):
+    """
+    Jalankan fn(*args) untuk setiap args di process pool.
+    Hasil di-yield SESUAI URUTAN input. workers <= 1 -> serial tanpa pool.
+    """
+    if workers is None:
+        workers = default_workers()
+    workers = min(workers, len(arg_list)) if arg_list else 1
+
+    if workers <= 1:
+        for args in arg_list:
+            yield fn(*args)
+        return
+
+    # Chunk agar overhead IPC per file kecil, tapi progress tetap halus
+    chunksize = max(1, len(arg_list) // (workers * 8))
+    jobs = [(fn, args) for args in arg_list]
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for result in executor.map(_call, jobs, chunksize=chunksize):
+            yield result
+    finally:
+        # Jika pemanggil berhenti di tengah jalan (misal validasi gagal),
+        # batalkan sisa pekerjaan daripada menunggu semua file selesai.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_load_recordings(paths, active_sensors=None, workers=None):
+    """
+    Baca banyak file CSV + ekstraksi fitur secara paralel (process pool).
+    Hasil di-yield SESUAI URUTAN `paths` (satu dict per file, lihat load_recording).
+    """
+    return _iter_pool(load_recording, [(path, active_sensors) for path in paths], workers)
+
+
+def iter_load_raw_recordings(paths, workers=None):
+    """Baca banyak file CSV jadi array mentah secara paralel (lihat load_raw_recording)."""
+    return _iter_pool(load_raw_recording, [(path,) for path in paths], workers)
+
+
+def iter_load_recordings_cached(paths, cache, active_sensors=None, workers=None):
+    """
+    Sama seperti iter_load_recordings(), tapi fitur diambil dari FeatureCache
+    jika file belum berubah. Hanya file baru/berubah yang dikirim ke pool,
+    lalu hasilnya disimpan ke cache. Urutan hasil tetap sesuai `paths`.
+    Setiap hasil punya key tambahan 'cached' (True jika dari cache).
+    """
+    cached = [cache.lookup(path, active_sensors) for path in paths]
+    missing = [path for path, hit in zip(paths, cached) if hit is None]
+
+    fresh = iter_load_recordings(missing, active_sensors, workers=workers)
+    try:
+        for path, hit in zip(paths, cached):
+            if hit is not None:
+                yield {'path': path, 'features': hit['features'], 'columns': hit['columns'],
+                       'sha1': hit['sha1'], 'error': None, 'cached': True}
+                continue
+
+            result = next(fresh)
+            result['cached'] = False
+            if not result['error']:
+                cache.store(path, result['features'], result['columns'], result['sha1'], active_sensors)
+            yield result
+    finally:
+        fresh.close()
+        cache.commit()
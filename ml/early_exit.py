@@ -0,0 +1,59 @@
+# ============================================================
+# EARLY-EXIT DETEKSI
+# Buffer yang terus bertambah dinilai di setiap checkpoint; sesi boleh
+# berhenti lebih awal jika hasil voting sudah stabil & meyakinkan.
+# ============================================================
+
+# Ambang default: semua model sepakat, keyakinan >= 80%, 3 checkpoint berturut-turut
+DEFAULT_MIN_AGREEMENT = 1.0
+DEFAULT_MIN_CONFIDENCE = 80.0
+DEFAULT_PATIENCE = 3
+
+
+def vote_agreement(label, details):
+    """Fraksi model yang memilih `label` (sama dengan vote_agreement di Predictor._tally_votes)."""
+    if not details:
+        return 0.0
+    return sum(1 for v in details if v.get('label') == label) / len(details)
+
+
+class EarlyExitMonitor:
+    """
+    Lacak hasil voting per checkpoint untuk 1 alat.
+
+      monitor = EarlyExitMonitor()
+      if monitor.update(*predictor.predict_vector(vec)):
+          ...  # sudah yakin, sesi boleh diakhiri
+
+    Yakin = label sama, agreement >= min_agreement dan confidence >= min_confidence
+    selama `patience` checkpoint berturut-turut.
+    """
+
+    def __init__(self, min_agreement=DEFAULT_MIN_AGREEMENT, min_confidence=DEFAULT_MIN_CONFIDENCE,
+                 patience=DEFAULT_PATIENCE):
+        self.min_agreement = min_agreement
+        self.min_confidence = min_confidence
+        self.patience = patience
+        self.reset()
+
+    def reset(self):
+        self.label = None
+        self.streak = 0
+        self.checkpoints = 0
+
+    def update(self, label, confidence, details=None):
+        """Catat hasil 1 checkpoint. Mengembalikan True jika sudah yakin."""
+        self.checkpoints += 1
+        passed = (vote_agreement(label, details) >= self.min_agreement
+                  and confidence >= self.min_confidence)
+        if not passed:
+            self.streak = 0
+        elif label == self.label:
+            self.streak += 1
+        else:
+            self.streak = 1
+        self.label = label
+        return self.is_confident()
+
+    def is_confident(self):
+        return self.streak >= self.patience
@@ -0,0 +1,154 @@
+import hashlib
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Scaler yang hasil transform-nya sepenuhnya ditentukan oleh get_params() + atribut fit ini.
+# Tipe lain (PowerTransformer, QuantileTransformer, pipeline, ...) tidak pernah dibagi antar model.
+SCALER_FITTED_ATTRS = {
+    'sklearn.preprocessing._data.StandardScaler': ('mean_', 'scale_', 'var_'),
+    'sklearn.preprocessing._data.MinMaxScaler': ('min_', 'scale_', 'data_min_', 'data_max_'),
+    'sklearn.preprocessing._data.MaxAbsScaler': ('max_abs_', 'scale_'),
+    'sklearn.preprocessing._data.RobustScaler': ('center_', 'scale_'),
+}
+
+
+class EnsembleExecutor:
+    """
+    Menjalankan banyak model (payload .joblib) untuk input fitur yang sama.
+
+    1. Layout kolom & scaler yang identik antar model hanya diproses sekali
+       (scaler dibandingkan dari konfigurasi + isinya, bukan dari objeknya).
+    2. Hasil scaling di-cache per signature preprocessing (layout + scaler).
+    3. predict_proba semua model dijalankan paralel di thread pool
+       (sebagian besar jalur predict sklearn/xgboost melepas GIL),
+       sehingga latensi voting ~ latensi model paling lambat.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._pool = None
+        self._scaler_keys = weakref.WeakKeyDictionary()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ensemble")
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def scaler_key(self, scaler):
+        """
+        Fingerprint scaler: tipe + konfigurasi (get_params) + array hasil fit.
+        Dua StandardScaler dengan parameter & hasil fit sama -> key sama.
+        Tipe di luar SCALER_FITTED_ATTRS -> key = identitas objek (tidak pernah dibagi).
+        """
+        if scaler is None:
+            return None
+        try:
+            return self._scaler_keys[scaler]
+        except (KeyError, TypeError):
+            pass
+
+        cls = type(scaler)
+        attrs = SCALER_FITTED_ATTRS.get(f"{cls.__module__}.{cls.__qualname__}")
+        if attrs is None:
+            key = f"id:{cls.__qualname__}:{id(scaler)}"
+        else:
+            h = hashlib.sha1(f"{cls.__module__}.{cls.__qualname__}".encode())
+            try:
+                params = scaler.get_params(deep=False)
+            except Exception:
+                params = None
+            h.update(repr(sorted(params.items()) if params is not None else None).encode())
+            for attr in attrs + ('n_features_in_', 'feature_names_in_'):
+                val = getattr(scaler, attr, None)
+                if val is None:
+                    continue
+                h.update(attr.encode())
+                if isinstance(val, np.ndarray) and val.dtype != object:
+                    h.update(str(val.dtype).encode())
+                    h.update(np.ascontiguousarray(val).tobytes())
+                else:
+                    h.update(repr(val).encode())
+            key = h.hexdigest()
+
+        try:
+            self._scaler_keys[scaler] = key
+        except TypeError:
+            pass # Objek tidak bisa di-weakref -> hitung ulang lain kali
+        return key
+
+    def prepare(self, X_raw, members):
+        """
+        Siapkan input siap-prediksi untuk setiap model.
+        members: list (name, payload)
+        Mengembalikan: list (name, model, X_scaled atau None jika gagal)
+        """
+        layouts = {}  # columns -> X_ready
+        scaled = {}   # (columns, scaler_key) -> X_scaled
+        prepared = []
+
+        for name, payload in members:
+            model = payload.get('model')
+            scaler = payload.get('scaler')
+            train_cols = payload.get('columns') # Urutan kolom saat training
+
+            # A. Penyelarasan Fitur (CRITICAL STEP)
+            layout_key = tuple(train_cols) if train_cols else None
+            if layout_key not in layouts:
+                if train_cols:
+                    # Reindex: Buang fitur berlebih, isi 0 untuk fitur yang kurang
+                    layouts[layout_key] = X_raw.reindex(columns=train_cols, fill_value=0)
+                else:
+                    # Fallback untuk model lama
+                    layouts[layout_key] = X_raw.fillna(0)
+            X_ready = layouts[layout_key]
+
+            # B. Scaling (sekali per signature preprocessing)
+            sig = (layout_key, self.scaler_key(scaler))
+            if sig not in scaled:
+                try:
+                    scaled[sig] = scaler.transform(X_ready) if scaler else X_ready
+                except Exception as e:
+                    print(f"Error scaling {name}: {e}")
+                    scaled[sig] = None
+            prepared.append((name, model, scaled[sig]))
+
+        return prepared
+
+    @staticmethod
+    def _run_model(model, X_scaled):
+        if hasattr(model, "predict_proba"):
+            return {'probs': model.predict_proba(X_scaled), 'classes': model.classes_}
+        return {'preds': model.predict(X_scaled), 'classes': getattr(model, 'classes_', None)}
+
+    def run(self, X_raw, members):
+        """
+        Jalankan semua model secara paralel.
+        Mengembalikan list dict per model (urutan sama dengan members):
+          {'name', 'probs'/'preds', 'classes'} atau {'name', 'error'}
+        """
+        prepared = self.prepare(X_raw, members)
+        jobs = [(name, model, X_scaled) for name, model, X_scaled in prepared if X_scaled is not None]
+
+        if len(jobs) > 1:
+            pool = self._get_pool()
+            futures = [(name, pool.submit(self._run_model, model, X_scaled)) for name, model, X_scaled in jobs]
+        else:
+            futures = [(name, None) for name, _, _ in jobs]
+
+        outputs = []
+        for (name, model, X_scaled), (_, future) in zip(jobs, futures):
+            try:
+                out = future.result() if future else self._run_model(model, X_scaled)
+                out['name'] = name
+            except Exception as e:
+                out = {'name': name, 'error': str(e)}
+            outputs.append(out)
+        return outputs
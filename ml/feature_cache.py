@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import sqlite3
+
+import numpy as np
+
+from ml.feature_extractor import DEFAULT_SENSORS, FEATURE_VERSION
+
+CACHE_FILENAME = ".feature_cache.sqlite"
+
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """Hash isi file (SHA-1) untuk memastikan konten benar-benar sama."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """
+    Cache fitur hasil ekstraksi di disk (SQLite) di samping folder dataset.
+
+    Key: path relatif + ukuran + mtime + hash isi file,
+    ditambah set sensor aktif dan versi feature extractor.
+    Hanya rekaman baru / berubah yang perlu di-extract ulang.
+    """
+
+    def __init__(self, data_path, filename=CACHE_FILENAME):
+        self.data_path = data_path
+        self.db_path = os.path.join(data_path, filename)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute(""" CREATE TABLE IF NOT EXISTS features (
+                                path text NOT NULL,
+                                sensors text NOT NULL,
+                                version integer NOT NULL,
+                                size integer NOT NULL,
+                                mtime_ns integer NOT NULL,
+                                sha1 text NOT NULL,
+                                columns text,
+                                features BLOB NOT NULL,
+                                PRIMARY KEY (path, sensors, version)
+                            ); """)
+        self.conn.commit()
+
+    @staticmethod
+    def sensors_key(active_sensors=None):
+        return ",".join(active_sensors if active_sensors else DEFAULT_SENSORS)
+
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.data_path))
+
+    def lookup(self, path, active_sensors=None):
+        """
+        Cari fitur ter-cache untuk file `path`.
+        Mengembalikan dict(features, columns, sha1) atau None jika harus di-extract ulang.
+        """
+        rel = self._rel(path)
+        sensors = self.sensors_key(active_sensors)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, sha1, columns, features FROM features WHERE path = ? AND sensors = ? AND version = ?",
+            (rel, sensors, FEATURE_VERSION)
+        ).fetchone()
+        if row is None:
+            return None
+
+        size, mtime_ns, sha1, columns, blob = row
+        if size != st.st_size:
+            return None
+
+        if mtime_ns != st.st_mtime_ns:
+            # File disentuh (mtime beda) -> cek isi dengan hash
+            if file_sha1(path) != sha1:
+                return None
+            self.conn.execute(
+                "UPDATE features SET mtime_ns = ? WHERE path = ? AND sensors = ? AND version = ?",
+                (st.st_mtime_ns, rel, sensors, FEATURE_VERSION)
+            )
+
+        return {
+            'features': np.frombuffer(blob, dtype=np.float64).copy(),
+            'columns': json.loads(columns) if columns else [],
+            'sha1': sha1,
+        }
+
+    def store(self, path, features, columns, sha1, active_sensors=None):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO features(path, sensors, version, size, mtime_ns, sha1, columns, features) VALUES(?,?,?,?,?,?,?,?)",
+            (self._rel(path), self.sensors_key(active_sensors), FEATURE_VERSION,
+             st.st_size, st.st_mtime_ns, sha1, json.dumps(columns),
+             np.asarray(features, dtype=np.float64).tobytes())
+        )
+
+    def prune(self, valid_paths):
+        """Hapus entry untuk file yang sudah tidak ada di dataset."""
+        valid = {self._rel(p) for p in valid_paths}
+        stale = [(p,) for (p,) in self.conn.execute("SELECT DISTINCT path FROM features") if p not in valid]
+        if stale:
+            self.conn.executemany("DELETE FROM features WHERE path = ?", stale)
+        return len(stale)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
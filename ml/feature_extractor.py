@@ -1,6 +1,15 @@
 import pandas as pd
 import numpy as np
 
+# Standar 8 Sensor E-Nose
+DEFAULT_SENSORS = ['MQ2', 'MQ3', 'MQ4', 'MQ6', 'MQ7', 'MQ8', 'MQ135', 'QCM']
+STATS = ['mean', 'std', 'min', 'max', 'range', 'skew', 'kurt']
+EPSILON = 1e-6 # Untuk menghindari pembagian dengan nol
+
+# Naikkan angka ini setiap kali rumus/urutan fitur berubah,
+# supaya cache fitur lama (ml/feature_cache.py) otomatis tidak dipakai.
+FEATURE_VERSION = 1
+
 def extract_features(df, active_sensors=None):
     """
     Ekstraksi fitur statistik + rasio dari sensor gas.
@@ -12,11 +21,10 @@ def extract_features(df, active_sensors=None):
     if active_sensors:
         sensors = active_sensors
     else:
-        # Standar 8 Sensor E-Nose
-        sensors = ['MQ2', 'MQ3', 'MQ4', 'MQ6', 'MQ7', 'MQ8', 'MQ135', 'QCM']
+        sensors = DEFAULT_SENSORS
         
     features = {}
-    epsilon = 1e-6 # Untuk menghindari pembagian dengan nol
+    epsilon = EPSILON
 
     # Normalisasi nama kolom input (Hapus spasi, Uppercase)
     # Agar 'MQ 3' terbaca sama dengan 'MQ3'
@@ -29,7 +37,7 @@ def extract_features(df, active_sensors=None):
 
         if not col_orig:
             # Jika sensor hilang dari data, isi 0 semua
-            for stat in ['mean', 'std', 'min', 'max', 'range', 'skew', 'kurt']:
+            for stat in STATS:
                 features[f'{sensor_name}_{stat}'] = 0.0
             continue
 
@@ -44,7 +52,7 @@ def extract_features(df, active_sensors=None):
         
         if len(series) == 0:
             # Handle file kosong
-            for stat in ['mean', 'std', 'min', 'max', 'range', 'skew', 'kurt']:
+            for stat in STATS:
                 features[f'{sensor_name}_{stat}'] = 0.0
             continue
 
@@ -74,4 +82,353 @@ def extract_features(df, active_sensors=None):
             if s != 'QCM':
                 features[f"{s}_qcm_ratio"] = get_mean(s) / (qcm_val + epsilon)
 
-    return features
\ No newline at end of file
+    return features
+
+
+# ============================================================
+# ENGINE VEKTOR (NumPy)
+# Hasil angka SAMA PERSIS dengan extract_features() di atas,
+# tapi dihitung sekaligus untuk semua sensor dalam satu pass.
+# ============================================================
+
+def feature_columns(active_sensors=None):
+    """
+    Urutan nama fitur (tetap) untuk output engine vektor.
+    Urutannya identik dengan urutan key dict dari extract_features().
+    """
+    sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+
+    cols = [f'{s}_{stat}' for s in sensors for stat in STATS]
+    cols += ['mq2_mq135_ratio', 'mq3_mq135_ratio', 'mq4_mq135_ratio']
+    if 'QCM' in sensors:
+        cols += [f"{s}_qcm_ratio" for s in sensors if s != 'QCM']
+    return cols
+
+
+def dataframe_to_array(df, active_sensors=None):
+    """
+    Konversi DataFrame mentah ke array float 2-D (n_sampel x n_sensor).
+    Mengembalikan: (values, present)
+      - values  : float64, NaN sudah diganti 0
+      - present : bool per sensor (False jika kolom tidak ada di file)
+    """
+    sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+    df_cols_norm = {str(c).upper().strip().replace(' ', ''): c for c in df.columns}
+
+    values = np.zeros((len(df), len(sensors)), dtype=np.float64)
+    present = np.zeros(len(sensors), dtype=bool)
+
+    for j, sensor_name in enumerate(sensors):
+        col_orig = df_cols_norm.get(sensor_name.upper())
+        if not col_orig:
+            continue
+
+        series = df[col_orig]
+        # Konversi numeric (handle koma desimal Indonesia)
+        if series.dtype == 'object':
+            series = pd.to_numeric(series.str.replace(',', '.'), errors='coerce')
+
+        values[:, j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        present[j] = True
+
+    values[np.isnan(values)] = 0.0
+    return values, present
+
+
+def extract_feature_vector(values, present=None, active_sensors=None, out=None):
+    """
+    Ekstraksi fitur dari array 2-D (n_sampel x n_sensor), urutan kolom
+    mengikuti `active_sensors` (default 8 sensor standar).
+    Mengembalikan vektor 1-D dengan urutan feature_columns(active_sensors).
+    """
+    sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+    n_sensors = len(sensors)
+    values = np.asarray(values, dtype=np.float64)
+
+    # Layout sensor-major (contiguous per sensor) supaya urutan penjumlahan
+    # sama dengan reduksi pandas per-Series -> hasil identik sampai bit terakhir.
+    # Buffer sesi (SessionBuffer) sudah channel-major -> dipakai langsung tanpa copy.
+    x = values.T
+    if x.ndim != 2 or x.strides[1] != x.itemsize:
+        x = np.ascontiguousarray(x)
+    n = x.shape[1]
+
+    if n == 0:
+        zeros = np.zeros(n_sensors, dtype=np.float64)
+        return features_from_moments(0, zeros, zeros, zeros, zeros, zeros, zeros, present, sensors, out)
+
+    count = np.float64(n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = x.sum(axis=1, dtype=np.float64) / count
+        adjusted = x - mean[:, None]
+        adjusted2 = adjusted ** 2
+        m2 = adjusted2.sum(axis=1, dtype=np.float64)
+        if n > 1:
+            m3 = (adjusted2 * adjusted).sum(axis=1, dtype=np.float64)
+            m4 = (adjusted2 ** 2).sum(axis=1, dtype=np.float64)
+        else:
+            m3 = m4 = None
+    return features_from_moments(n, mean, m2, m3, m4, x.min(axis=1), x.max(axis=1), present, sensors, out)
+
+
+def features_from_moments(n, mean, m2, m3, m4, x_min, x_max, present=None, active_sensors=None, out=None):
+    """
+    Susun vektor fitur (urutan feature_columns) dari momen per sensor:
+    n sampel, mean, jumlah momen pusat m2/m3/m4 (sum (x-mean)^k), min, max.
+    Dipakai engine batch di atas dan ekstraktor streaming (ml/streaming_features.py).
+    """
+    sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+    n_sensors = len(sensors)
+    n_stats = len(STATS)
+
+    if out is None:
+        out = np.empty(len(feature_columns(sensors)), dtype=np.float64)
+    if present is None:
+        present = np.ones(n_sensors, dtype=bool)
+    stats = out[:n_sensors * n_stats].reshape(n_sensors, n_stats)
+
+    if n == 0:
+        stats[:] = 0.0
+    else:
+        count = np.float64(n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Std (ddof=1), sama seperti Series.std()
+            var = m2 / (count - 1) if n > 1 else np.full(n_sensors, np.nan)
+
+            stats[:, 0] = mean
+            stats[:, 1] = np.sqrt(var)
+            stats[:, 2] = x_min
+            stats[:, 3] = x_max
+            stats[:, 4] = x_max - x_min
+
+            # m3/m4 None = tidak dihitung (FeaturePlan tanpa skew/kurt) -> 0
+            stats[:, 5] = _skew_from_moments(count, m2, m3) if n > 1 and m3 is not None else 0.0
+            stats[:, 6] = _kurt_from_moments(count, m2, m4) if n > 1 and m4 is not None else 0.0
+
+    # Sensor yang tidak ada di file -> semua statistik 0
+    stats[~np.asarray(present, dtype=bool)] = 0.0
+
+    # Rasio Antar Sensor
+    idx = {s: j for j, s in enumerate(sensors)}
+
+    def get_mean(s):
+        j = idx.get(s)
+        return stats[j, 0] if j is not None else 0.0
+
+    pos = n_sensors * n_stats
+    mq135 = get_mean('MQ135') + EPSILON
+    out[pos] = get_mean('MQ2') / mq135
+    out[pos + 1] = get_mean('MQ3') / mq135
+    out[pos + 2] = get_mean('MQ4') / mq135
+    pos += 3
+
+    if 'QCM' in idx:
+        qcm_val = get_mean('QCM') + EPSILON
+        for s in sensors:
+            if s != 'QCM':
+                out[pos] = get_mean(s) / qcm_val
+                pos += 1
+
+    return out
+
+
+def stack_recordings(recordings):
+    """
+    Gabungkan banyak rekaman (list array n_sampel x n_sensor) jadi satu
+    array kontigu + offsets (panjang N+1). Rekaman i = values[offsets[i]:offsets[i+1]].
+    """
+    lengths = np.fromiter((len(r) for r in recordings), dtype=np.int64, count=len(recordings))
+    offsets = np.zeros(len(recordings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    if not recordings:
+        return np.empty((0, 0), dtype=np.float64), offsets
+    values = np.concatenate([np.asarray(r, dtype=np.float64) for r in recordings], axis=0)
+    return values, offsets
+
+
+def extract_features_batch(values, offsets, present=None, active_sensors=None):
+    """
+    Ekstraksi fitur untuk BANYAK rekaman sekaligus.
+      - values  : array 2-D gabungan semua rekaman (total_sampel x n_sensor)
+      - offsets : batas rekaman (panjang N+1), lihat stack_recordings()
+      - present : bool (N x n_sensor), opsional
+    Mengembalikan: (matriks fitur N x n_fitur, list nama kolom)
+    Tidak ada dict per baris; tiap baris ditulis langsung ke matriks hasil.
+    """
+    columns = feature_columns(active_sensors)
+    n_rec = len(offsets) - 1
+    X = np.empty((n_rec, len(columns)), dtype=np.float64)
+
+    for i in range(n_rec):
+        start, end = offsets[i], offsets[i + 1]
+        rec_present = present[i] if present is not None else None
+        extract_feature_vector(values[start:end], rec_present, active_sensors, out=X[i])
+
+    return X, columns
+
+
+# ============================================================
+# FEATURE PLAN
+# Model hanya memakai kolom di payload['columns']; sisanya dibuang oleh
+# reindex di EnsembleExecutor. FeaturePlan menghitung HANYA statistik
+# (dan sensor) yang dibutuhkan gabungan kolom semua model aktif, misalnya
+# skew/kurt dilewati jika tidak ada model yang memakainya.
+# Nilai kolom yang dihitung identik dengan extract_feature_vector().
+# ============================================================
+
+# Statistik -> momen yang diperlukan
+_STAT_NEEDS = {
+    'mean': (), 'std': ('m2',), 'min': ('minmax',), 'max': ('minmax',), 'range': ('minmax',),
+    'skew': ('m2', 'm3'), 'kurt': ('m2', 'm4'),
+}
+
+
+class FeaturePlan:
+    """
+    Rencana ekstraksi untuk sekumpulan kolom fitur.
+
+      plan = compile_feature_plan(payload['columns'])
+      X, columns = plan.extract_batch(values, offsets, present)
+
+    `columns` = kolom yang diminta & dikenal, urutan feature_columns().
+    Kolom yang tidak dikenal diabaikan (reindex mengisinya 0 seperti biasa).
+    """
+
+    def __init__(self, columns, active_sensors=None):
+        self.sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+        full = feature_columns(self.sensors)
+        wanted = set(columns)
+        self.columns = [c for c in full if c in wanted]
+        self.index = np.array([full.index(c) for c in self.columns], dtype=np.intp)
+
+        # Sensor & momen yang perlu dihitung
+        needs = set()
+        rows = set()
+        sensor_idx = {name: j for j, name in enumerate(self.sensors)}
+        for name in self.columns:
+            sensor, _, stat = name.rpartition('_')
+            if stat in _STAT_NEEDS and sensor in sensor_idx:
+                rows.add(sensor_idx[sensor])
+                needs.update(_STAT_NEEDS[stat])
+            elif name.endswith('_mq135_ratio'):
+                rows.update(sensor_idx[s] for s in (name.split('_')[0].upper(), 'MQ135') if s in sensor_idx)
+            elif name.endswith('_qcm_ratio'):
+                rows.update(sensor_idx[s] for s in (name[:-len('_qcm_ratio')], 'QCM') if s in sensor_idx)
+        self.rows = np.array(sorted(rows), dtype=np.intp)
+        self.needs = needs
+
+    def __len__(self):
+        return len(self.columns)
+
+    def extract(self, values, present=None, out=None):
+        """Seperti extract_feature_vector(), tapi hanya kolom self.columns."""
+        values = np.asarray(values, dtype=np.float64)
+        return self._extract_rows(np.ascontiguousarray(values[:, self.rows].T), present, out)
+
+    def extract_batch(self, values, offsets, present=None):
+        """Seperti extract_features_batch(): (matriks N x len(plan), self.columns)."""
+        n_rec = len(offsets) - 1
+        X = np.empty((n_rec, len(self.columns)), dtype=np.float64)
+        if n_rec == 0:
+            return X, list(self.columns)
+
+        # Sensor yang dipakai diambil sekali untuk semua rekaman (sensor-major)
+        x = np.ascontiguousarray(np.asarray(values, dtype=np.float64)[:, self.rows].T)
+        for i in range(n_rec):
+            rec_present = present[i] if present is not None else None
+            self._extract_rows(x[:, offsets[i]:offsets[i + 1]], rec_present, X[i])
+        return X, list(self.columns)
+
+    def _extract_rows(self, x, present, out):
+        # x: sensor-major (len(rows) x n_sampel). Baris sensor lain tetap 0.
+        n_sensors = len(self.sensors)
+        n = x.shape[1]
+        mean = np.zeros(n_sensors, dtype=np.float64)
+        m2 = np.zeros(n_sensors, dtype=np.float64)
+        x_min = np.zeros(n_sensors, dtype=np.float64)
+        x_max = np.zeros(n_sensors, dtype=np.float64)
+        m3 = m4 = None
+
+        if n > 0 and len(self.rows):
+            count = np.float64(n)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean[self.rows] = x.sum(axis=1, dtype=np.float64) / count
+                if self.needs & {'m2', 'm3', 'm4'}:
+                    adjusted = x - mean[self.rows][:, None]
+                    adjusted2 = adjusted ** 2
+                    m2[self.rows] = adjusted2.sum(axis=1, dtype=np.float64)
+                    if n > 1 and 'm3' in self.needs:
+                        m3 = np.zeros(n_sensors, dtype=np.float64)
+                        m3[self.rows] = (adjusted2 * adjusted).sum(axis=1, dtype=np.float64)
+                    if n > 1 and 'm4' in self.needs:
+                        m4 = np.zeros(n_sensors, dtype=np.float64)
+                        m4[self.rows] = (adjusted2 ** 2).sum(axis=1, dtype=np.float64)
+            if 'minmax' in self.needs:
+                x_min[self.rows] = x.min(axis=1)
+                x_max[self.rows] = x.max(axis=1)
+
+        full = features_from_moments(n, mean, m2, m3, m4, x_min, x_max, present, self.sensors)
+        if out is None:
+            return full[self.index]
+        out[:] = full[self.index]
+        return out
+
+
+_PLAN_CACHE = {}
+
+
+def compile_feature_plan(columns=None, active_sensors=None):
+    """
+    FeaturePlan untuk `columns` (None = semua fitur), di-cache per
+    himpunan kolom supaya tidak dikompilasi ulang setiap deteksi.
+    """
+    sensors = tuple(active_sensors if active_sensors else DEFAULT_SENSORS)
+    cols = feature_columns(list(sensors)) if columns is None else columns
+    key = (frozenset(cols), sensors)
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = _PLAN_CACHE[key] = FeaturePlan(cols, list(sensors))
+    return plan
+
+
+def _zero_out_fperr(arg):
+    # Sama seperti pandas.core.nanops: buang sisa error floating point
+    return arg.dtype.type(0) if np.abs(arg) < 1e-14 else arg
+
+
+# Rumus akhir skew/kurt dihitung per sensor dengan skalar float64 (bukan array),
+# karena pow() versi array NumPy bisa beda 1 ulp dari versi skalar yang dipakai
+# Series.skew()/Series.kurtosis(). Bagian berat (penjumlahan momen) tetap vektor.
+
+def _skew_from_moments(count, m2, m3):
+    """Skewness G1 (bias-corrected) dari jumlah momen pusat, identik dengan Series.skew()."""
+    result = np.empty(len(m2), dtype=np.float64)
+    for j in range(len(m2)):
+        if count < 3:
+            result[j] = np.nan
+            continue
+        a2 = _zero_out_fperr(m2[j])
+        a3 = _zero_out_fperr(m3[j])
+        if a2 == 0:
+            result[j] = 0.0
+            continue
+        result[j] = (count * (count - 1) ** 0.5 / (count - 2)) * (a3 / a2 ** 1.5)
+    return result
+
+
+def _kurt_from_moments(count, m2, m4):
+    """Excess kurtosis G2 (bias-corrected) dari jumlah momen pusat, identik dengan Series.kurtosis()."""
+    result = np.empty(len(m2), dtype=np.float64)
+    for j in range(len(m2)):
+        if count < 4:
+            result[j] = np.nan
+            continue
+        adj = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+        numerator = _zero_out_fperr(count * (count + 1) * (count - 1) * m4[j])
+        denominator = _zero_out_fperr((count - 2) * (count - 3) * m2[j] ** 2)
+        if denominator == 0:
+            result[j] = 0.0
+            continue
+        result[j] = numerator / denominator - adj
+    return result
\ No newline at end of file
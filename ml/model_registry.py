@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import joblib
+
+
+class ModelRegistry:
+    """
+    Cache payload model (.joblib) yang tetap tinggal di memori.
+
+    - Setiap file hanya di-load sekali, di-key dengan (path, mtime).
+    - Jika file di disk berubah (mtime/ukuran beda), payload di-reload di tempat.
+    - Jika total ukuran melebihi budget memori, model yang paling lama
+      tidak dipakai (LRU) dibuang dari cache.
+
+    Ukuran payload diestimasi dari ukuran file .joblib di disk.
+    Daftar file di folder model juga di-cache (di-key dengan mtime folder).
+    """
+
+    DEFAULT_BUDGET_MB = 512
+
+    def __init__(self, max_bytes=None, revalidate_after=2.0):
+        if max_bytes is None:
+            max_bytes = self.DEFAULT_BUDGET_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        # Jeda minimum (detik) sebelum stat() ulang file yang sama,
+        # supaya inferensi beruntun sama sekali tidak menyentuh disk.
+        self.revalidate_after = revalidate_after
+
+        self._entries = OrderedDict() # path -> dict(payload, mtime, size, checked_at)
+        self._total_bytes = 0
+        self._listings = {}           # folder -> dict(files, mtime, checked_at)
+        self._lock = threading.RLock()
+
+    def get(self, path):
+        """
+        Ambil payload untuk `path`.
+        Mengembalikan: (payload, error_message)
+        """
+        path = os.path.abspath(path)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and now - entry['checked_at'] < self.revalidate_after:
+                self._entries.move_to_end(path)
+                return entry['payload'], None
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None, f"File {os.path.basename(path)} tidak ditemukan."
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                entry['checked_at'] = now
+                self._entries.move_to_end(path)
+                return entry['payload'], None
+
+        # Cache miss / file berubah -> load dari disk (di luar lock, bisa lama)
+        try:
+            payload = joblib.load(path)
+        except Exception as e:
+            return None, str(e)
+
+        if not isinstance(payload, dict):
+            return None, "Format model usang/corrupt."
+
+        with self._lock:
+            self._drop(path)
+            self._entries[path] = {
+                'payload': payload,
+                'mtime': st.st_mtime_ns,
+                'size': st.st_size,
+                'checked_at': now,
+            }
+            self._total_bytes += st.st_size
+            self._evict()
+
+        return payload, None
+
+    def list_dir(self, directory, suffix='.joblib'):
+        """
+        Daftar nama file `suffix` di `directory` (terurut).
+        Folder hanya di-stat ulang tiap `revalidate_after` detik dan di-list
+        ulang hanya jika mtime-nya berubah. Folder tidak ada -> [].
+        """
+        directory = os.path.abspath(directory)
+        key = (directory, suffix)
+        now = time.monotonic()
+
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing and now - listing['checked_at'] < self.revalidate_after:
+                return list(listing['files'])
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(key, None)
+            return []
+
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing and listing['mtime'] == mtime:
+                listing['checked_at'] = now
+                return list(listing['files'])
+
+        try:
+            files = sorted(f for f in os.listdir(directory) if f.endswith(suffix))
+        except OSError:
+            return []
+
+        with self._lock:
+            self._listings[key] = {'files': files, 'mtime': mtime, 'checked_at': now}
+        return list(files)
+
+    def invalidate(self, path=None):
+        """Buang satu entry (atau semua jika path=None, termasuk daftar folder) dari cache."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._listings.clear()
+                self._total_bytes = 0
+            else:
+                self._drop(os.path.abspath(path))
+
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'models': len(self._entries),
+                'bytes': self._total_bytes,
+                'budget': self.max_bytes,
+            }
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry:
+            self._total_bytes -= entry['size']
+
+    def _evict(self):
+        # Selalu sisakan minimal 1 model (yang barusan dipakai),
+        # walaupun ukurannya sendiri sudah melebihi budget.
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry['size']
@@ -0,0 +1,317 @@
+import os
+import json
+import glob
+import struct
+
+import numpy as np
+import pandas as pd
+
+from ml.feature_extractor import DEFAULT_SENSORS, feature_columns, extract_features_batch
+
+# ============================================================
+# FORMAT DATASET PACKED (.enpk)
+#
+#   [4B  magic "ENPK"] [4B versi uint32] [8B panjang header uint64]
+#   [header JSON utf-8, di-pad ke kelipatan 64 byte]
+#   [array mentah, masing-masing rata 64 byte]:
+#       data    : float32 (total_sampel x n_channel)  -> semua rekaman disambung
+#       offsets : int64   (n_rekaman + 1)             -> rekaman i = data[offsets[i]:offsets[i+1]]
+#       present : uint8   (n_rekaman x n_channel)     -> 0 jika kolom tidak ada di CSV asli
+#
+# Label & metadata (nama file asal) ada di header JSON.
+# Seluruh array dibaca lewat memory-map (np.memmap), jadi membuka
+# dataset 10.000 rekaman = 1 kali open, bukan 10.000 kali read_csv.
+# ============================================================
+
+PACKED_EXT = ".enpk"
+MAGIC = b"ENPK"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+# Jumlah baris sampel maksimum yang di-copy ke RAM sekaligus saat ekstraksi fitur
+DEFAULT_CHUNK_SAMPLES = 1_000_000
+
+# Urutan channel standar (8 sensor gas + lingkungan)
+STANDARD_CHANNELS = DEFAULT_SENSORS + ['TEMP', 'HUM', 'PRES']
+
+
+def _pad(n):
+    return (ALIGN - n % ALIGN) % ALIGN
+
+
+def write_packed(path, recordings, labels, channels, present=None, meta=None, skipped=None):
+    """
+    Tulis banyak rekaman ke 1 file .enpk.
+      - recordings : list array (n_sampel x n_channel), urutan kolom = channels
+      - labels     : list label per rekaman
+      - present    : bool (n_rekaman x n_channel), opsional
+      - meta       : list dict per rekaman (misal {'source': 'Etanol/Etanol 1 mikro.csv'})
+      - skipped    : list dict file sumber yang gagal diimport (format sama dengan meta),
+                     supaya cek kesegaran tidak menganggapnya file baru
+    """
+    n_rec = len(recordings)
+    n_ch = len(channels)
+
+    offsets = np.zeros(n_rec + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in recordings], out=offsets[1:])
+    if present is None:
+        present = np.ones((n_rec, n_ch), dtype=np.uint8)
+    present = np.asarray(present, dtype=np.uint8).reshape(n_rec, n_ch)
+
+    arrays = [
+        ('data', '<f4', [int(offsets[-1]), n_ch]),
+        ('offsets', '<i8', [n_rec + 1]),
+        ('present', '|u1', [n_rec, n_ch]),
+    ]
+
+    # Hitung posisi tiap array (butuh panjang header -> iterasi sampai stabil)
+    header = {
+        'channels': list(channels),
+        'n_recordings': n_rec,
+        'labels': [str(l) for l in labels],
+        'meta': meta if meta is not None else [{} for _ in range(n_rec)],
+        'skipped': skipped or [],
+        'arrays': {},
+    }
+    data_start = 0
+    while True:
+        pos = data_start
+        for name, dtype, shape in arrays:
+            header['arrays'][name] = {'offset': pos, 'dtype': dtype, 'shape': shape}
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            pos += nbytes + _pad(nbytes)
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        header_bytes += b' ' * _pad(16 + len(header_bytes))
+        if 16 + len(header_bytes) == data_start:
+            break
+        data_start = 16 + len(header_bytes)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<IQ', FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+
+        # data ditulis per rekaman (tidak perlu menyambung semua di RAM)
+        for r in recordings:
+            f.write(np.ascontiguousarray(r, dtype='<f4').tobytes())
+        nbytes = int(offsets[-1]) * n_ch * 4
+        f.write(b'\0' * _pad(nbytes))
+
+        for arr in (offsets.astype('<i8'), present):
+            f.write(arr.tobytes())
+            f.write(b'\0' * _pad(arr.nbytes))
+
+    os.replace(tmp_path, path)
+
+
+class PackedDataset:
+    """
+    Pembaca file .enpk (read-only, memory-mapped).
+
+    ds = PackedDataset("sample_data/dataset.enpk")
+    ds.data      -> memmap float32 (total_sampel x n_channel)
+    ds.offsets   -> batas rekaman
+    ds.labels[i], ds.meta[i], ds.recording(i), ds.to_dataframe(i)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+            if magic != MAGIC:
+                raise ValueError(f"Bukan file dataset packed: {path}")
+            version, header_len = struct.unpack('<IQ', f.read(12))
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Versi format {version} belum didukung.")
+            header = json.loads(f.read(header_len).decode('utf-8'))
+
+        self.channels = header['channels']
+        self.labels = header['labels']
+        self.meta = header['meta']
+        self.skipped = header.get('skipped', [])
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            shape = tuple(spec['shape'])
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=spec['dtype'])
+            else:
+                arrays[name] = np.memmap(path, dtype=spec['dtype'], mode='r',
+                                         offset=spec['offset'], shape=shape)
+        self.data = arrays['data']
+        self.offsets = np.asarray(arrays['offsets'])
+        self.present = np.asarray(arrays['present']).astype(bool)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def channel_indices(self, names):
+        """Index channel untuk daftar nama sensor (-1 jika tidak ada)."""
+        lookup = {c: i for i, c in enumerate(self.channels)}
+        return [lookup.get(n.upper(), -1) for n in names]
+
+    def recording(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def to_dataframe(self, i):
+        """Rekaman ke-i sebagai DataFrame (kolom yang tidak ada di CSV asli dibuang)."""
+        cols = [c for c, p in zip(self.channels, self.present[i]) if p]
+        idx = [j for j, p in enumerate(self.present[i]) if p]
+        return pd.DataFrame(np.asarray(self.recording(i)[:, idx], dtype=np.float64), columns=cols)
+
+    def describe(self, i):
+        source = self.meta[i].get('source', f"#{i}") if i < len(self.meta) else f"#{i}"
+        return f"{source} [{self.labels[i]}]"
+
+    def iter_chunks(self, chunk_samples=None):
+        """
+        Bagi rekaman jadi potongan (start, end) dengan total sampel <= chunk_samples
+        (minimal 1 rekaman per potongan). Dipakai untuk proses bertahap.
+        """
+        chunk_samples = chunk_samples or DEFAULT_CHUNK_SAMPLES
+        n_rec = len(self)
+        start = 0
+        while start < n_rec:
+            limit = self.offsets[start] + chunk_samples
+            end = int(np.searchsorted(self.offsets, limit, side='right')) - 1
+            end = min(max(end, start + 1), n_rec)
+            yield start, end
+            start = end
+
+    def read_chunk(self, start, end, active_sensors=None):
+        """
+        Ambil data mentah rekaman [start, end) untuk sensor terpilih sebagai float64.
+        Hanya potongan ini yang di-copy ke RAM; sisanya tetap di memory-map.
+        Mengembalikan: (values, offsets lokal, present)
+        """
+        sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+        idx = self.channel_indices(sensors)
+        lo, hi = self.offsets[start], self.offsets[end]
+
+        block = self.data[lo:hi]
+        values = np.zeros((hi - lo, len(sensors)), dtype=np.float64)
+        present = np.zeros((end - start, len(sensors)), dtype=bool)
+        for j, c in enumerate(idx):
+            if c >= 0:
+                values[:, j] = block[:, c]
+                present[:, j] = self.present[start:end, c]
+
+        return values, self.offsets[start:end + 1] - lo, present
+
+    def extract_features(self, active_sensors=None, chunk_samples=None, progress=None):
+        """
+        Matriks fitur untuk semua rekaman, diproses per potongan
+        (RAM yang dipakai ~ chunk_samples, bukan ukuran dataset).
+        progress: callback opsional progress(jumlah_rekaman_selesai, total)
+        Mengembalikan: (X, columns)
+        """
+        columns = feature_columns(active_sensors)
+        X = np.empty((len(self), len(columns)), dtype=np.float64)
+
+        for start, end in self.iter_chunks(chunk_samples):
+            values, offsets, present = self.read_chunk(start, end, active_sensors)
+            X[start:end], _ = extract_features_batch(values, offsets, present, active_sensors)
+            if progress:
+                progress(end, len(self))
+
+        return X, columns
+
+
+def find_packed_files(data_path):
+    """Daftar file .enpk langsung di dalam folder (atau file itu sendiri)."""
+    if os.path.isfile(data_path):
+        return [data_path] if data_path.endswith(PACKED_EXT) else []
+    return sorted(glob.glob(os.path.join(data_path, "*" + PACKED_EXT)))
+
+
+def list_csv_tree(data_path):
+    """File CSV dataset (1 subfolder = 1 label): list (path, label), urutan stabil."""
+    items = []
+    for folder in sorted(f.path for f in os.scandir(data_path) if f.is_dir()):
+        for path in sorted(glob.glob(os.path.join(folder, "*.csv"))):
+            items.append((path, os.path.basename(folder)))
+    return items
+
+
+def source_fingerprint(path, data_path):
+    """Identitas file sumber untuk cek kesegaran: path relatif (= label) + ukuran + mtime."""
+    st = os.stat(path)
+    return {'source': os.path.relpath(path, data_path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def packed_stale_reason(packed_files, data_path):
+    """
+    Bandingkan sumber yang tercatat di file .enpk dengan pohon CSV saat ini.
+    Mengembalikan None jika sama persis, atau alasan (string) jika ada CSV
+    baru / dihapus / dipindah folder (label berubah) / diubah isinya.
+    """
+    recorded = {}
+    for path in packed_files:
+        ds = PackedDataset(path)
+        for item in list(ds.meta) + list(ds.skipped):
+            if 'source' not in item or 'mtime_ns' not in item:
+                return f"{os.path.basename(path)} dibuat versi lama (tanpa ukuran/mtime sumber)"
+            recorded[os.path.normpath(item['source'])] = (item.get('size'), item['mtime_ns'])
+
+    current = {}
+    for path, _ in list_csv_tree(data_path):
+        fp = source_fingerprint(path, data_path)
+        current[os.path.normpath(fp['source'])] = (fp['size'], fp['mtime_ns'])
+
+    added = current.keys() - recorded.keys()
+    removed = recorded.keys() - current.keys()
+    changed = [k for k in current.keys() & recorded.keys() if current[k] != recorded[k]]
+    if added or removed or changed:
+        return f"{len(added)} CSV baru/dipindah, {len(removed)} dihapus/dipindah, {len(changed)} berubah"
+    return None
+
+
+def import_csv_tree(data_path, out_path, workers=None, log=print):
+    """
+    Import folder dataset CSV (1 subfolder = 1 label) ke 1 file .enpk.
+    Label yang disimpan = nama folder asli (mapping label tetap diterapkan saat training).
+    Mengembalikan: (jumlah rekaman, list file gagal)
+    """
+    from ml.dataset_loader import iter_load_raw_recordings
+
+    tree = list_csv_tree(data_path)
+    paths = [path for path, _ in tree]
+    labels = [label for _, label in tree]
+    # Fingerprint diambil sebelum dibaca (file yang berubah saat import -> terdeteksi basi)
+    fingerprints = {path: source_fingerprint(path, data_path) for path in paths}
+
+    log(f"📦 Import {len(paths)} file CSV dari {data_path} ...")
+
+    channels = list(STANDARD_CHANNELS)
+    results, ok_labels, failed, skipped = [], [], [], []
+    for result, label in zip(iter_load_raw_recordings(paths, workers=workers), labels):
+        if result['error']:
+            failed.append((result['path'], result['error']))
+            skipped.append(fingerprints[result['path']])
+            continue
+        for c in result['columns']:
+            if c not in channels:
+                channels.append(c)
+        results.append(result)
+        ok_labels.append(label)
+
+    # Susun ulang kolom tiap rekaman ke urutan channel gabungan
+    recordings, present, meta = [], [], []
+    for result in results:
+        values = np.zeros((len(result['values']), len(channels)), dtype=np.float32)
+        mask = np.zeros(len(channels), dtype=np.uint8)
+        for k, c in enumerate(result['columns']):
+            j = channels.index(c)
+            values[:, j] = result['values'][:, k]
+            mask[j] = 1
+        recordings.append(values)
+        present.append(mask)
+        meta.append(fingerprints[result['path']])
+
+    write_packed(out_path, recordings, ok_labels, channels,
+                 present=np.array(present, dtype=np.uint8).reshape(len(recordings), len(channels)),
+                 meta=meta, skipped=skipped)
+
+    log(f"✅ {len(recordings)} rekaman disimpan ke {out_path} ({len(failed)} file gagal).")
+    return len(recordings), failed
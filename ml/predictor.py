@@ -1,15 +1,24 @@
-import joblib
 import os
 import numpy as np
 import pandas as pd
-from ml.feature_extractor import extract_features
+from ml.feature_extractor import (DEFAULT_SENSORS, feature_columns, dataframe_to_array, stack_recordings,
+                                  compile_feature_plan)
+from ml.model_registry import ModelRegistry
+from ml.ensemble import EnsembleExecutor
 
 class Predictor:
     MODEL_DIR = "model"
 
-    def __init__(self):
+    def __init__(self, registry=None, cache_budget_mb=None):
         self.model = None # Compatibility for UI state checks
-        pass # Stateless, load on demand to save memory/avoid conflicts
+        # Model di-load sekali lalu tinggal di memori (reload otomatis jika file berubah)
+        if registry is None:
+            max_bytes = cache_budget_mb * 1024 * 1024 if cache_budget_mb else None
+            registry = ModelRegistry(max_bytes=max_bytes)
+        self.registry = registry
+        self.ensemble = EnsembleExecutor()
+        # whitelist -> (kolom per model, FeaturePlan); lihat _feature_plan()
+        self._plans = {}
 
     def load_model_from_payload(self, payload):
         """Compatibility: Validates payload (UI requirement)"""
@@ -28,107 +37,166 @@ class Predictor:
         Memuat Model, Scaler, dan Metadata dari file .joblib
         """
         path = os.path.join(self.MODEL_DIR, model_filename)
-        if not os.path.exists(path):
-            return None, f"File {model_filename} tidak ditemukan."
-        
-        try:
-            payload = joblib.load(path)
-            # Validasi Payload
-            if not isinstance(payload, dict):
-                return None, "Format model usang/corrupt."
-            
-            return payload, None
-        except Exception as e:
-            return None, str(e)
+        # Ambil dari cache registry (joblib.load hanya saat pertama / file berubah)
+        return self.registry.get(path)
 
     def predict_from_dataframe(self, df, whitelist=None):
         """
         Fungsi Utama Prediksi dari DataFrame (Raw Data Sensor).
         Mengembalikan: (Label Final, Confidence, Details List)
         """
-        # 1. PREPROCESSING DATA
         # Normalisasi Header (Hapus spasi, Uppercase)
         df.columns = [str(c).upper().strip().replace(' ', '') for c in df.columns]
-        
+        return self.predict_batch([df], whitelist)[0]
+
+    def predict_batch(self, recordings, whitelist=None):
+        """
+        Prediksi BANYAK rekaman sekaligus.
+        recordings: list DataFrame mentah, atau array (n_sampel x 8 sensor standar).
+        Setiap model hanya dipanggil SEKALI untuk seluruh matriks fitur.
+        Mengembalikan: list (Label Final, Confidence, Details List) per rekaman.
+        """
+        # 1. PREPROCESSING DATA
         # Ekstraksi Fitur Statistik
-        # Kita extract SEMUA kemungkinan fitur dulu (default 8 sensor)
-        # Nanti model akan memilih fitur yang dia butuhkan saja.
+        # Hanya fitur yang dipakai model-model di whitelist (lihat _feature_plan)
+        error_result = ("Error Ekstraksi Fitur", 0.0, [{"name": "System", "label": "Error", "conf": 0.0}])
+        results = [error_result] * len(recordings)
+
+        arrays, presents, valid_idx = [], [], []
+        for i, rec in enumerate(recordings):
+            try:
+                if isinstance(rec, pd.DataFrame):
+                    values, present = dataframe_to_array(rec)
+                else:
+                    # Potong/Pad ke 8 sensor standar; sensor hasil padding ditandai tidak ada
+                    values = np.asarray(rec, dtype=np.float64)
+                    n_cols = min(values.shape[1], len(DEFAULT_SENSORS))
+                    if n_cols < len(DEFAULT_SENSORS):
+                        values = np.pad(values, ((0, 0), (0, len(DEFAULT_SENSORS) - n_cols)))
+                    values = values[:, :len(DEFAULT_SENSORS)]
+                    present = np.arange(len(DEFAULT_SENSORS)) < n_cols
+                arrays.append(values)
+                presents.append(present)
+                valid_idx.append(i)
+            except Exception as e:
+                print(f"Error ekstraksi rekaman #{i}: {e}")
+
+        if not valid_idx:
+            return results
+
         try:
-            features = extract_features(df) # Output: Dictionary
-            # Bungkus jadi DataFrame 1 baris
-            X_raw = pd.DataFrame([features])
+            members = self._load_members(whitelist)
+            values, offsets = stack_recordings(arrays)
+            X, columns = self._feature_plan(whitelist, members).extract_batch(values, offsets, np.array(presents))
         except Exception as e:
-            return "Error Ekstraksi Fitur", 0.0, [{"name": "System", "label": "Error", "conf": 0.0}]
+            print(f"Error ekstraksi fitur: {e}")
+            return results
+
+        for i, res in zip(valid_idx, self._predict_members(X, columns, members)):
+            results[i] = res
+        return results
+
+    def predict_features(self, X, columns, whitelist=None):
+        """
+        Prediksi dari matriks fitur yang sudah jadi (N x n_fitur, urutan `columns`).
+        Mengembalikan: list (Label Final, Confidence, Details List) per baris.
+        """
+        if len(X) == 0:
+            return []
+        return self._predict_members(X, columns, self._load_members(whitelist))
+
+    def _predict_members(self, X, columns, members):
+        if len(X) == 0:
+            return []
+
+        # Matriks N baris (1 baris per rekaman)
+        X_raw = pd.DataFrame(X, columns=columns)
 
         # 2. SIAPKAN MODEL (Voting System)
-        available_models = self._get_model_list(whitelist)
-        if not available_models:
-            return "Belum Ada Model", 0.0, []
+        if not members:
+            return [("Belum Ada Model", 0.0, [])] * len(X_raw)
 
-        votes = []
-        
-        # 3. PREDIKSI SETIAP MODEL
-        for model_name in available_models:
+        # 3. PREDIKSI SEMUA MODEL (scaling di-dedup, predict paralel, 1x per model)
+        outputs = self.ensemble.run(X_raw, members)
+
+        results = []
+        for row in range(len(X_raw)):
+            votes = []
+            for out in outputs:
+                vote = self._output_to_vote(out, row)
+                if vote: votes.append(vote)
+            results.append(self._tally_votes(votes))
+        return results
+
+    def _load_members(self, whitelist):
+        """List (nama_file, payload) untuk semua model yang ikut voting."""
+        members = []
+        for model_name in self._get_model_list(whitelist):
             payload, err = self._load_pipeline(model_name)
             if err: continue
-            
-            model = payload.get('model')
-            scaler = payload.get('scaler')
-            train_cols = payload.get('columns') # Urutan kolom saat training
-            
-            # A. Penyelarasan Fitur (CRITICAL STEP)
-            # Pastikan X_input punya kolom yang SAMA PERSIS dengan saat training
-            if train_cols:
-                # Reindex: Buang fitur berlebih, isi 0 untuk fitur yang kurang
-                X_ready = X_raw.reindex(columns=train_cols, fill_value=0)
-            else:
-                # Fallback untuk model lama
-                X_ready = X_raw.fillna(0)
+            members.append((model_name, payload))
+        return members
+
+    def _feature_plan(self, whitelist, members):
+        """
+        FeaturePlan untuk gabungan payload['columns'] semua model yang ikut voting,
+        di-cache per whitelist (dikompilasi ulang jika kolom model berubah, misal
+        file model di-reload). Model lama tanpa 'columns' -> semua fitur.
+        """
+        key = tuple(sorted(whitelist)) if whitelist else None
+        signature = tuple((name, tuple(payload.get('columns') or ())) for name, payload in members)
+        cached = self._plans.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        if any(not payload.get('columns') for _, payload in members):
+            plan = compile_feature_plan()
+        else:
+            plan = compile_feature_plan({c for _, payload in members for c in payload['columns']})
+        self._plans[key] = (signature, plan)
+        return plan
+
+    def _output_to_vote(self, out, row):
+        """Ubah output EnsembleExecutor (baris ke-`row`) jadi 1 vote."""
+        model_name = out['name']
+        if 'error' in out:
+            print(f"Error predict {model_name}: {out['error']}")
+            return None
+
+        try:
+            classes = out['classes']
+            if 'probs' in out:
+                probs = out['probs'][row] # [Prob_Kelas0, Prob_Kelas1]
                 
-            # B. Scaling
-            try:
-                if scaler:
-                    X_scaled = scaler.transform(X_ready)
+                # Cari kelas dengan probabilitas tertinggi
+                max_idx = np.argmax(probs)
+                pred_label = str(classes[max_idx])
+                confidence = probs[max_idx] * 100
+                
+            else:
+                # Fallback jika model tidak support probability (misal SVM linear)
+                # predict() bisa mengembalikan label langsung (string) atau index kelas
+                pred_idx = out['preds'][row]
+                if classes is not None and isinstance(pred_idx, (int, np.integer)):
+                    pred_label = str(classes[pred_idx])
                 else:
-                    X_scaled = X_ready
-            except:
-                continue # Skip model jika scaling gagal
+                    pred_label = str(pred_idx)
+                confidence = 100.0 # Blind confidence
+        except Exception as e:
+            print(f"Error predict {model_name}: {e}")
+            return None
 
-            # C. Prediksi
-            try:
-                # Dapatkan Probability (jika support)
-                if hasattr(model, "predict_proba"):
-                    probs = model.predict_proba(X_scaled)[0] # [Prob_Kelas0, Prob_Kelas1]
-                    classes = model.classes_
-                    
-                    # Cari kelas dengan probabilitas tertinggi
-                    max_idx = np.argmax(probs)
-                    pred_label = str(classes[max_idx])
-                    confidence = probs[max_idx] * 100
-                    
-                else:
-                    # Fallback jika model tidak support probability (misal SVM linear)
-                    pred_idx = model.predict(X_scaled)[0]
-                    if hasattr(model, 'classes_'):
-                        pred_label = str(model.classes_[pred_idx])
-                    else:
-                        pred_label = str(pred_idx)
-                    confidence = 100.0 # Blind confidence
-
-                # Mapping Legacy (Jaga-jaga model lama yang outputnya 0/1)
-                if pred_label == "0": pred_label = "Terdeteksi (Legacy)"
-                if pred_label == "1": pred_label = "Tidak Terdeteksi (Legacy)"
-
-                # Simpan Vote
-                votes.append({
-                    "name": model_name.replace(".joblib", ""),
-                    "label": pred_label,
-                    "conf": confidence
-                })
-                
-            except Exception as e:
-                print(f"Error predict {model_name}: {e}")
+        # Mapping Legacy (Jaga-jaga model lama yang outputnya 0/1)
+        if pred_label == "0": pred_label = "Terdeteksi (Legacy)"
+        if pred_label == "1": pred_label = "Tidak Terdeteksi (Legacy)"
+
+        return {
+            "name": model_name.replace(".joblib", ""),
+            "label": pred_label,
+            "conf": confidence
+        }
 
+    def _tally_votes(self, votes):
         if not votes:
             return "Gagal Prediksi", 0.0, []
 
@@ -155,28 +223,48 @@ class Predictor:
 
         return winner_label, final_conf, votes
 
+    def predict_samples(self, samples, whitelist=None):
+        """
+        Prediksi dari sampel yang sudah di-parse oleh SerialWorker
+        (array n_sampel x 11: 8 sensor standar + Temp, Hum, Pres),
+        misalnya SessionBuffer.values. View dari buffer dibaca langsung tanpa copy.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 2 or len(samples) == 0:
+            return "Data Kosong", 0.0, []
+        if samples.shape[1] < len(DEFAULT_SENSORS):
+            samples = np.pad(samples, ((0, 0), (0, len(DEFAULT_SENSORS) - samples.shape[1])))
+
+        try:
+            members = self._load_members(whitelist)
+            plan = self._feature_plan(whitelist, members)
+            X = plan.extract(samples[:, :len(DEFAULT_SENSORS)])[np.newaxis, :]
+        except Exception as e:
+            print(f"Error ekstraksi sampel: {e}")
+            return "Error Ekstraksi Fitur", 0.0, [{"name": "System", "label": "Error", "conf": 0.0}]
+        return self._predict_members(X, plan.columns, members)[0]
+
+    def predict_vector(self, vector, whitelist=None):
+        """
+        Prediksi dari 1 vektor fitur yang sudah jadi (urutan feature_columns()),
+        misalnya dari StreamingFeatureExtractor / SessionBuffer.features.
+        """
+        return self.predict_features(np.asarray(vector, dtype=np.float64)[np.newaxis, :], feature_columns(), whitelist)[0]
+
     def predict_all_models(self, buffered_data, whitelist=None):
-        """Wrapper untuk data buffer (string csv)"""
-        # Parse CSV string ke DataFrame
+        """Wrapper untuk data buffer (string csv), untuk pemanggil lama"""
+        # Parse CSV string ke array
         try:
             parsed_data = []
             for row in buffered_data:
                 if not row.strip(): continue
                 vals = list(map(float, row.split(',')))
+                # Potong/Pad ke 8 sensor standar
+                vals = vals[:len(DEFAULT_SENSORS)] + [0.0] * (len(DEFAULT_SENSORS) - len(vals))
                 parsed_data.append(vals)
             
             if not parsed_data: return "Data Kosong", 0.0, []
-            
-            # Asumsi 8 Sensor Standar jika dari Buffer Device
-            cols = ['MQ2', 'MQ3', 'MQ4', 'MQ6', 'MQ7', 'MQ8', 'MQ135', 'QCM']
-            # Potong/Pad
-            clean_data = []
-            for p in parsed_data:
-                if len(p) >= 8: clean_data.append(p[:8])
-                else: clean_data.append(p + [0]*(8-len(p)))
-                
-            df = pd.DataFrame(clean_data, columns=cols)
-            return self.predict_from_dataframe(df, whitelist)
+            return self.predict_samples(np.array(parsed_data), whitelist)
             
         except Exception as e:
             return f"Error Buffer: {str(e)}", 0.0, []
@@ -186,8 +274,8 @@ class Predictor:
         return self._get_model_list(None)
 
     def _get_model_list(self, whitelist):
-        if not os.path.exists(self.MODEL_DIR): return []
-        files = [f for f in os.listdir(self.MODEL_DIR) if f.endswith('.joblib')]
+        # Listing folder di-cache registry (revalidasi mtime folder tiap 2 s)
+        files = self.registry.list_dir(self.MODEL_DIR)
         if whitelist:
             return [f for f in files if f in whitelist]
         return files
\ No newline at end of file
@@ -0,0 +1,86 @@
+import numpy as np
+
+from ml.packed_dataset import STANDARD_CHANNELS
+from ml.streaming_features import StreamingFeatureExtractor
+
+# Perkiraan sampling rate tertinggi (firmware binary = 100 Hz), untuk alokasi awal
+SESSION_RESERVE_HZ = 100
+
+
+class SessionBuffer:
+    """
+    Buffer sampel 1 sesi deteksi: array NumPy yang dialokasikan di awal
+    + timestamp per sampel. Pengganti list string CSV.
+
+    Disimpan channel-major (n_channel x kapasitas), sehingga setiap sensor
+    kontigu di memori dan ekstraksi fitur bisa membaca view-nya langsung.
+    Jika kapasitas habis, array digandakan (jarang terjadi bila reserve() pas).
+
+    buf.values      -> view (n_sampel x n_channel), tanpa copy
+    buf.timestamps  -> view (n_sampel,)
+    buf.features    -> StreamingFeatureExtractor (jika track_features=True),
+                       vektor fitur sesi selalu siap tanpa membaca ulang buffer
+    """
+
+    def __init__(self, n_channels=len(STANDARD_CHANNELS), capacity=1024, track_features=False):
+        self.n_channels = n_channels
+        self._data = np.empty((n_channels, capacity), dtype=np.float64)
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.features = StreamingFeatureExtractor() if track_features else None
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return self._data.shape[1]
+
+    def reserve(self, capacity):
+        """Pastikan muat `capacity` sampel tanpa alokasi ulang."""
+        if capacity <= self.capacity:
+            return
+        data = np.empty((self.n_channels, capacity), dtype=np.float64)
+        timestamps = np.empty(capacity, dtype=np.float64)
+        data[:, :self.size] = self._data[:, :self.size]
+        timestamps[:self.size] = self._timestamps[:self.size]
+        self._data, self._timestamps = data, timestamps
+
+    def reserve_seconds(self, seconds, rate_hz=SESSION_RESERVE_HZ):
+        self.reserve(int(seconds * rate_hz * 1.1) + 1)
+
+    def clear(self):
+        self.size = 0
+        if self.features is not None:
+            self.features.reset()
+
+    def append(self, timestamps, values):
+        """Tambah 1 potongan sampel: timestamps (n,), values (n x n_channel)."""
+        n = len(values)
+        if n == 0:
+            return
+        end = self.size + n
+        if end > self.capacity:
+            self.reserve(max(end, self.capacity * 2))
+        self._data[:, self.size:end] = np.asarray(values).T[:self.n_channels]
+        self._timestamps[self.size:end] = timestamps
+        self.size = end
+        if self.features is not None:
+            self.features.update(values)
+
+    @property
+    def values(self):
+        return self._data[:, :self.size].T
+
+    @property
+    def timestamps(self):
+        return self._timestamps[:self.size]
+
+    def channels(self, start, stop=None):
+        """View kolom [start, stop), misal channels(0, 8) = 8 sensor gas."""
+        return self._data[start:stop, :self.size].T
+
+    def duration(self):
+        if self.size < 2:
+            return 0.0
+        return float(self._timestamps[self.size - 1] - self._timestamps[0])
@@ -0,0 +1,235 @@
+from collections import deque
+
+import numpy as np
+
+from ml.feature_extractor import DEFAULT_SENSORS, feature_columns, features_from_moments
+
+# ============================================================
+# EKSTRAKSI FITUR STREAMING
+# Momen berjalan (count, mean, M2, M3, M4, min, max) per sensor, diperbarui
+# setiap potongan sampel masuk (rumus Welford / Pebay untuk menggabung momen).
+# Vektor fitur bisa diminta kapan saja dengan biaya O(1) terhadap jumlah sampel.
+# Hasil sama dengan extract_feature_vector() sampai galat pembulatan
+# (bukan bit-identik: urutan penjumlahan berbeda).
+# ============================================================
+
+
+class RunningMoments:
+    """
+    Momen pusat per kanal yang bisa di-update dan digabung.
+      m2/m3/m4 = sum (x - mean)^k, sama dengan yang dipakai features_from_moments().
+    """
+
+    def __init__(self, n_channels=len(DEFAULT_SENSORS)):
+        self.n_channels = n_channels
+        self.reset()
+
+    def reset(self):
+        n = self.n_channels
+        self.count = 0
+        self.mean = np.zeros(n, dtype=np.float64)
+        self.m2 = np.zeros(n, dtype=np.float64)
+        self.m3 = np.zeros(n, dtype=np.float64)
+        self.m4 = np.zeros(n, dtype=np.float64)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+
+    def copy(self):
+        other = RunningMoments(self.n_channels)
+        other.count = self.count
+        for name in ('mean', 'm2', 'm3', 'm4', 'min', 'max'):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    @classmethod
+    def from_block(cls, block):
+        """Momen dari 1 potongan sampel (n x n_channel), dihitung dua-pass."""
+        block = np.asarray(block, dtype=np.float64)
+        moments = cls(block.shape[1])
+        if len(block) == 0:
+            return moments
+        moments.count = len(block)
+        moments.mean = block.mean(axis=0)
+        d = block - moments.mean
+        d2 = d * d
+        moments.m2 = d2.sum(axis=0)
+        moments.m3 = (d2 * d).sum(axis=0)
+        moments.m4 = (d2 * d2).sum(axis=0)
+        moments.min = block.min(axis=0)
+        moments.max = block.max(axis=0)
+        return moments
+
+    def update(self, block):
+        """Tambah potongan sampel (n x n_channel). 1 sampel = update Welford biasa."""
+        if len(block):
+            self.merge(RunningMoments.from_block(block))
+
+    def merge(self, other):
+        """Gabung momen `other` ke sini (Pebay 2008, rumus pairwise untuk momen ke-2..4)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            for name in ('mean', 'm2', 'm3', 'm4', 'min', 'max'):
+                setattr(self, name, getattr(other, name).copy())
+            return
+
+        na, nb = float(self.count), float(other.count)
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * na * nb
+
+        m4 = (self.m4 + other.m4
+              + term * delta_n2 * (na * na - na * nb + nb * nb)
+              + 6.0 * delta_n2 * (na * na * other.m2 + nb * nb * self.m2)
+              + 4.0 * delta_n * (na * other.m3 - nb * self.m3))
+        m3 = (self.m3 + other.m3
+              + term * delta_n * (na - nb)
+              + 3.0 * delta_n * (na * other.m2 - nb * self.m2))
+        self.m2 = self.m2 + other.m2 + term
+        self.m3 = m3
+        self.m4 = m4
+        self.mean = self.mean + delta_n * nb
+        self.count = self.count + other.count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+
+class StreamingFeatureExtractor:
+    """
+    Vektor fitur (urutan feature_columns) yang selalu siap:
+
+      fx = StreamingFeatureExtractor()
+      fx.update(block)          # tiap potongan dari SerialWorker (n x >=8)
+      fx.feature_vector()       # kapan saja, tanpa membaca ulang sampel
+
+    Kolom block di luar active_sensors (Temp/Hum/Pres) diabaikan.
+    """
+
+    def __init__(self, active_sensors=None):
+        self.sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+        self.columns = feature_columns(self.sensors)
+        self.moments = RunningMoments(len(self.sensors))
+
+    def __len__(self):
+        return self.moments.count
+
+    def reset(self):
+        self.moments.reset()
+
+    def update(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        n_sensors = len(self.sensors)
+        if block.ndim != 2 or len(block) == 0:
+            return
+        if block.shape[1] < n_sensors:
+            block = np.pad(block, ((0, 0), (0, n_sensors - block.shape[1])))
+        self.moments.update(block[:, :n_sensors])
+
+    def feature_vector(self, out=None):
+        return vector_from_moments(self.moments, self.sensors, out)
+
+    def features(self):
+        """Dict {nama_fitur: nilai}, sama bentuknya dengan extract_features()."""
+        return dict(zip(self.columns, self.feature_vector().tolist()))
+
+
+def vector_from_moments(moments, active_sensors=None, out=None):
+    """RunningMoments -> vektor fitur (urutan feature_columns)."""
+    m = moments
+    return features_from_moments(m.count, m.mean, m.m2, m.m3, m.m4, m.min, m.max,
+                                 active_sensors=active_sensors, out=out)
+
+
+class SlidingWindowFeatures:
+    """
+    Fitur atas `window` sampel terakhir, vektor baru setiap `hop` sampel.
+
+    Sampel dikumpulkan per blok `hop` (RunningMoments per blok). Momen jendela
+    dijaga dengan agregator dua-stack (queue dari 2 stack): blok baru masuk ke
+    stack belakang yang menyimpan gabungan berjalan, blok terlama keluar dari
+    stack depan yang menyimpan gabungan suffix. Setiap hop = O(1) merge
+    (amortized), berapa pun window/hop. Min/max ikut di RunningMoments.
+    Panjang jendela efektif dibulatkan ke atas menjadi kelipatan hop.
+
+      wf = SlidingWindowFeatures(window=500, hop=50)
+      vector = wf.update(block)   # vektor jendela terbaru, None jika tidak ada jendela baru
+      if vector is not None:
+          predictor.predict_vector(vector)
+    """
+
+    def __init__(self, window, hop, active_sensors=None):
+        self.sensors = active_sensors if active_sensors else DEFAULT_SENSORS
+        self.hop = max(1, int(hop))
+        self.n_blocks = max(1, -(-int(window) // self.hop))
+        self.window = self.n_blocks * self.hop
+        self.reset()
+
+    def reset(self):
+        n_sensors = len(self.sensors)
+        self.front = []  # Gabungan suffix: front[-1] = blok terlama s/d blok terbaru di stack depan
+        self.back = []   # Blok mentah, urutan masuk
+        self.back_agg = RunningMoments(n_sensors)
+        self.current = RunningMoments(n_sensors)
+        self.count = 0  # Total sampel yang sudah masuk
+
+    def __len__(self):
+        return len(self.front) + len(self.back)
+
+    def is_full(self):
+        return len(self) == self.n_blocks
+
+    def update(self, block):
+        """
+        Tambah potongan sampel (n x >=n_sensor).
+        Mengembalikan vektor jendela penuh TERBARU yang selesai di potongan ini, atau None.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        n_sensors = len(self.sensors)
+        if block.ndim != 2 or len(block) == 0:
+            return None
+        if block.shape[1] < n_sensors:
+            block = np.pad(block, ((0, 0), (0, n_sensors - block.shape[1])))
+        block = block[:, :n_sensors]
+
+        completed = False
+        start = 0
+        while start < len(block):
+            take = min(self.hop - self.current.count, len(block) - start)
+            self.current.update(block[start:start + take])
+            start += take
+            self.count += take
+            if self.current.count == self.hop:
+                self._push(self.current)
+                self.current = RunningMoments(n_sensors)
+                completed = completed or self.is_full()
+        # Beberapa jendela selesai sekaligus -> hanya yang terbaru yang dibentuk vektornya
+        return self.feature_vector() if completed else None
+
+    def _push(self, moments):
+        if self.is_full():
+            self._pop()
+        self.back.append(moments)
+        self.back_agg.merge(moments)
+
+    def _pop(self):
+        if not self.front:
+            # Pindahkan stack belakang ke depan sambil membentuk gabungan suffix
+            agg = RunningMoments(len(self.sensors))
+            for moments in reversed(self.back):
+                agg.merge(moments)
+                self.front.append(agg.copy())
+            self.back = []
+            self.back_agg.reset()
+        self.front.pop()
+
+    def window_moments(self):
+        """Momen gabungan blok-blok di jendela saat ini."""
+        merged = self.front[-1].copy() if self.front else RunningMoments(len(self.sensors))
+        merged.merge(self.back_agg)
+        return merged
+
+    def feature_vector(self, out=None):
+        return vector_from_moments(self.window_moments(), self.sensors, out)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+from ml.packed_dataset import import_csv_tree, PackedDataset, PACKED_EXT
+
+# ============================================================
+# PACK DATASET CSV -> 1 FILE .enpk
+# Pemakaian:
+#   python pack_dataset.py [folder_data] [file_output.enpk]
+# Default: sample_data -> sample_data/dataset.enpk
+# ============================================================
+
+if __name__ == "__main__":
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "sample_data"
+    out_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_path, "dataset" + PACKED_EXT)
+
+    if not os.path.isdir(data_path):
+        print(f"❌ Folder tidak ditemukan: {data_path}")
+        sys.exit(1)
+
+    count, failed = import_csv_tree(data_path, out_path)
+    for path, err in failed:
+        print(f"   ❌ {path}: {err}")
+
+    ds = PackedDataset(out_path)
+    print(f"📦 {len(ds)} rekaman | {len(ds.data)} baris | channel: {', '.join(ds.channels)}")
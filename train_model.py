@@ -12,7 +12,8 @@ import warnings
 import glob
 import joblib
 # Gunakan ekstraktor fitur terpusat agar konsisten dengan aplikasi
-from ml.feature_extractor import extract_features
+from ml.feature_extractor import dataframe_to_array, stack_recordings, extract_features_batch
+from ml.packed_dataset import PackedDataset, packed_stale_reason
 
 warnings.filterwarnings('ignore')
 
@@ -20,6 +21,9 @@ warnings.filterwarnings('ignore')
 # KONFIGURASI PATH DAN LABEL 
 # ============================================================ 
 BASE_PATH = 'sample_data'
+# Jika ada dataset packed (lihat pack_dataset.py), data dibaca dari sini
+# per potongan lewat memory-map (bisa lebih besar dari RAM)
+PACKED_PATH = os.path.join(BASE_PATH, 'dataset.enpk')
 MODEL_DIR = "model"
 NEW_MODEL_NAME = "pork_detection_model.joblib"
 
@@ -32,46 +36,73 @@ label_map = {
 # ============================================================ 
 # LOAD SELURUH DATASET 
 # ============================================================ 
-all_features = []
+all_recordings = []
+all_present = []
 all_labels = []
-
-print("\nMemuat seluruh file CSV dari direktori 'sample_data'...\n")
-
-for folder_name, label in label_map.items():
-    folder_path = os.path.join(BASE_PATH, folder_name)
-    if not os.path.exists(folder_path):
-        print(f"⚠  Folder tidak ditemukan: {folder_path}")
-        continue
+X_packed = None
+
+# Pakai .enpk hanya jika isinya masih sama dengan folder CSV
+# (tidak ada CSV baru / dihapus / dipindah label / berubah)
+use_packed = False
+if os.path.exists(PACKED_PATH):
+    stale = packed_stale_reason([PACKED_PATH], BASE_PATH)
+    if stale:
+        print(f"\n⚠ {PACKED_PATH} tidak sesuai folder CSV ({stale}), memakai CSV. Jalankan ulang pack_dataset.py.")
+    else:
+        use_packed = True
+
+if use_packed:
+    print(f"\nMemuat dataset packed: {PACKED_PATH}\n")
+    ds = PackedDataset(PACKED_PATH)
+    X_all, columns = ds.extract_features()
+    keep = [i for i, l in enumerate(ds.labels) if l in label_map]
+    X_packed = X_all[keep]
+    all_labels = [label_map[ds.labels[i]] for i in keep]
+    print(f"📦 {len(keep)} dari {len(ds)} rekaman dipakai.")
+else:
+    print("\nMemuat seluruh file CSV dari direktori 'sample_data'...\n")
+
+    for folder_name, label in label_map.items():
+        folder_path = os.path.join(BASE_PATH, folder_name)
+        if not os.path.exists(folder_path):
+            print(f"⚠  Folder tidak ditemukan: {folder_path}")
+            continue
         
-    csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
-
-    if not csv_files:
-        print(f"⚠ Folder '{folder_name}' kosong!")
-        continue
-
-    print(f"📂 Folder: {folder_name} → {len(csv_files)} file")
-
-    for file_path in csv_files:
-        try:
-            # Menggunakan semicolon sebagai separator
-            df = pd.read_csv(file_path, sep=';', decimal=',')
-            if df.empty:
-                print(f"File {file_path} kosong.")
-                continue
-            features = extract_features(df)
-            all_features.append(features)
-            all_labels.append(label)
-        except Exception as e:
-            print(f"❌ Error memproses {file_path}: {e}")
-
-if not all_features:
+        csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+
+        if not csv_files:
+            print(f"⚠ Folder '{folder_name}' kosong!")
+            continue
+
+        print(f"📂 Folder: {folder_name} → {len(csv_files)} file")
+
+        for file_path in csv_files:
+            try:
+                # Menggunakan semicolon sebagai separator
+                df = pd.read_csv(file_path, sep=';', decimal=',')
+                if df.empty:
+                    print(f"File {file_path} kosong.")
+                    continue
+                values, present = dataframe_to_array(df)
+                all_recordings.append(values)
+                all_present.append(present)
+                all_labels.append(label)
+            except Exception as e:
+                print(f"❌ Error memproses {file_path}: {e}")
+
+if not all_labels:
     print("\n❌ Tidak ada data yang berhasil dimuat. Tidak dapat melanjutkan proses training.")
     exit()
 
 # ============================================================ 
 # MEMBUAT DATAFRAME FITUR 
 # ============================================================ 
-X_df = pd.DataFrame(all_features).fillna(0)
+if X_packed is not None:
+    X = X_packed
+else:
+    values, offsets = stack_recordings(all_recordings)
+    X, columns = extract_features_batch(values, offsets, np.array(all_present))
+X_df = pd.DataFrame(X, columns=columns).fillna(0)
 y_series = pd.Series(all_labels, name="Label")
 
 print("\nTotal dataset yang akan di-train:", len(X_df))
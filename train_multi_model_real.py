@@ -10,7 +10,7 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from ml.feature_extractor import extract_features
+from ml.feature_extractor import dataframe_to_array, stack_recordings, extract_features_batch
 
 # --- KONFIGURASI PATH ---
 BASE_DATA_PATH = 'sample_data'
@@ -22,7 +22,8 @@ if not os.path.exists(MODEL_DIR):
 print("--- TRAINING REAL DATA (MULTI-MODEL) ---")
 
 # 1. LOAD DATA OTOMATIS (Auto-Detect Folder)
-all_features = []
+all_recordings = []
+all_present = []
 all_labels = []
 
 if not os.path.exists(BASE_DATA_PATH):
@@ -44,18 +45,21 @@ for folder_path in subfolders:
             # Validasi kolom
             if df.shape[1] < 8: continue
             
-            feats = extract_features(df)
-            all_features.append(feats)
+            values, present = dataframe_to_array(df)
+            all_recordings.append(values)
+            all_present.append(present)
             all_labels.append(label_name)
         except: pass
 
-if not all_features:
+if not all_recordings:
     print("❌ Tidak ada data valid!")
     exit()
 
 # 2. PREPROCESSING
 print("\n⚙️ Memproses Data...")
-X_df = pd.DataFrame(all_features).fillna(0)
+values, offsets = stack_recordings(all_recordings)
+X, columns = extract_features_batch(values, offsets, np.array(all_present))
+X_df = pd.DataFrame(X, columns=columns).fillna(0)
 le = LabelEncoder()
 y = le.fit_transform(all_labels)
 
@@ -1,21 +1,36 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QCheckBox, QRadioButton, QButtonGroup, QHBoxLayout
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QCheckBox, QRadioButton, QButtonGroup, QHBoxLayout, QComboBox,
+                             QPushButton, QFileDialog, QMessageBox)
 from PyQt6.QtCore import QTimer, pyqtSignal, Qt
-from arduino.serial_worker import SerialWorker, get_available_ports
+from datetime import datetime
+from arduino.device_manager import DeviceManager
+from arduino.telemetry import dump_telemetry
+from arduino.protocol import NUM_VALUES
+import numpy as np
 import random
+import time
+
+SIMULATION_DEVICE = "Simulasi"
 
 class DeviceControlWidget(QWidget):
-    connection_status_changed = pyqtSignal(bool, str)
-    data_received = pyqtSignal(str)
+    connection_status_changed = pyqtSignal(bool, str) # True jika minimal 1 alat terhubung
+    samples_received = pyqtSignal(str, object, object) # (device, timestamps (n,), values (n x 11)) per potongan
+    active_device_changed = pyqtSignal(str) # Alat yang ditampilkan di grafik
 
     def __init__(self, parent=None):
         super().__init__(parent)
         
         self.is_connected = False
-        self.is_connecting = False
-        self.current_port = None
-        self.serial_worker = None
         self.is_simulation = False # Flag simulasi
 
+        # Semua port e-nose dibuka sekaligus (1 thread per alat)
+        self.manager = DeviceManager(parent=self)
+        self.manager.samples_received.connect(self.samples_received.emit)
+        self.manager.device_connected.connect(self.handle_device_connected)
+        self.manager.device_disconnected.connect(self.handle_device_disconnected)
+        self.manager.protocol_selected.connect(self.handle_protocol_selected)
+        self.manager.ports_changed.connect(self.handle_ports_changed)
+        self.protocols = {}
+
         layout = QVBoxLayout(self)
         layout.setSpacing(5)
         
@@ -23,6 +38,31 @@ class DeviceControlWidget(QWidget):
         self.status_label = QLabel("Mencari perangkat...")
         self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #F59E0B;") # Orange
         layout.addWidget(self.status_label)
+
+        # --- PILIH ALAT (jika lebih dari 1 terhubung) ---
+        self.device_selector = QComboBox()
+        self.device_selector.setStyleSheet("""
+            QComboBox { padding: 2px 10px; border: 1px solid #CBD5E1; border-radius: 6px; background-color: white; color: #334155; }
+            QComboBox::drop-down { border: 0px; }
+        """)
+        self.device_selector.setVisible(False)
+        self.device_selector.currentTextChanged.connect(self._on_selector_changed)
+        layout.addWidget(self.device_selector)
+
+        # --- TELEMETRI (alat yang dipilih) ---
+        telemetry_layout = QHBoxLayout()
+        self.telemetry_label = QLabel("")
+        self.telemetry_label.setStyleSheet("font-size: 10px; color: #64748B;")
+        self.telemetry_label.setWordWrap(True)
+        self.btn_dump_telemetry = QPushButton("💾")
+        self.btn_dump_telemetry.setToolTip("Simpan telemetri akuisisi ke file JSON")
+        self.btn_dump_telemetry.setFixedWidth(28)
+        self.btn_dump_telemetry.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_dump_telemetry.clicked.connect(self.dump_telemetry)
+        telemetry_layout.addWidget(self.telemetry_label, 1)
+        telemetry_layout.addWidget(self.btn_dump_telemetry)
+        layout.addLayout(telemetry_layout)
+        self._set_telemetry_visible(False)
         
         # --- SIMULATION CONTROLS ---
         sim_layout = QVBoxLayout()
@@ -49,24 +89,99 @@ class DeviceControlWidget(QWidget):
         
         layout.addLayout(sim_layout)
         
+        # --- DISCOVERY (thread latar, bukan timer di thread GUI) ---
+        self.manager.start_discovery()
+
         # --- TIMERS ---
-        self.scan_timer = QTimer(self)
-        self.scan_timer.timeout.connect(self.scan_and_connect)
-        self.scan_timer.start(3000) 
-        
         # Timer khusus untuk generate data dummy
         self.sim_data_timer = QTimer(self)
         self.sim_data_timer.timeout.connect(self.generate_dummy_data)
 
+        # Refresh label telemetri
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.timeout.connect(self.refresh_telemetry)
+        self.telemetry_timer.start(1000)
+
+    def connected_devices(self):
+        """Daftar id alat yang sedang terhubung (termasuk simulasi)."""
+        if self.is_simulation:
+            return [SIMULATION_DEVICE]
+        return list(self.manager.connected)
+
+    def active_device(self):
+        return self.device_selector.currentText() or None
+
+    def record_paint(self, device, timestamps):
+        """Dipanggil MainPage setelah 1 potongan sampel selesai diproses/digambar."""
+        telemetry = self.manager.telemetry(device)
+        if telemetry is not None:
+            telemetry.record_paint(timestamps)
+
+    def _set_telemetry_visible(self, visible):
+        self.telemetry_label.setVisible(visible)
+        self.btn_dump_telemetry.setVisible(visible)
+
+    def refresh_telemetry(self):
+        telemetry = self.manager.telemetry(self.active_device())
+        self._set_telemetry_visible(telemetry is not None)
+        if telemetry is not None:
+            self.telemetry_label.setText(telemetry.summary())
+
+    def dump_telemetry(self):
+        snapshots = self.manager.telemetry_snapshots()
+        if not snapshots:
+            QMessageBox.warning(self, "Telemetri", "Tidak ada alat yang terhubung.")
+            return
+        default_name = f"telemetri_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        path, _ = QFileDialog.getSaveFileName(self, "Simpan Telemetri", default_name, "JSON (*.json)")
+        if not path:
+            return
+        try:
+            dump_telemetry(path, snapshots)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan telemetri: {e}")
+
+    def shutdown(self):
+        self.telemetry_timer.stop()
+        self.sim_data_timer.stop()
+        self.manager.close_all()
+
+    def _on_selector_changed(self, device):
+        if device:
+            self.active_device_changed.emit(device)
+
+    def _refresh_devices(self):
+        devices = self.connected_devices()
+        current = self.device_selector.currentText()
+
+        self.device_selector.blockSignals(True)
+        self.device_selector.clear()
+        self.device_selector.addItems(devices)
+        if current in devices:
+            self.device_selector.setCurrentText(current)
+        self.device_selector.blockSignals(False)
+        self.device_selector.setVisible(len(devices) > 1)
+        if devices and self.device_selector.currentText() != current:
+            self.active_device_changed.emit(self.device_selector.currentText())
+
+        self.is_connected = bool(devices)
+        if self.is_simulation:
+            return
+        if len(devices) > 1:
+            self.status_label.setText(f"{len(devices)} Perangkat TERHUBUNG")
+        elif devices:
+            mode = self.protocols.get(devices[0])
+            self.status_label.setText("Perangkat TERHUBUNG" + (f" ({mode.upper()})" if mode else ""))
+        if devices:
+            self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #10B981;") # Green
+
     def toggle_simulation_mode(self, checked):
         self.is_simulation = checked
         self.sim_controls_widget.setVisible(checked)
         
         if checked:
             # STOP Scanning asli
-            self.scan_timer.stop()
-            if self.serial_worker:
-                self.serial_worker.stop()
+            self.manager.close_all()
             
             # START Simulasi
             self.status_label.setText("Mode Simulasi: AKTIF")
@@ -74,25 +189,25 @@ class DeviceControlWidget(QWidget):
             self.sim_data_timer.start(1000) # Generate data tiap 1 detik
             
             # Fake connect signal
-            self.is_connected = True
+            self._refresh_devices()
             self.connection_status_changed.emit(True, "Simulasi Terhubung")
             
         else:
             # STOP Simulasi
             self.sim_data_timer.stop()
-            self.is_connected = False
+            self._refresh_devices()
             self.connection_status_changed.emit(False, "Simulasi Berhenti")
             
             # RESTART Scanning asli
             self.status_label.setText("Mencari perangkat...")
             self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #F59E0B;")
-            self.scan_timer.start(3000)
+            self.manager.start_discovery()
 
     def generate_dummy_data(self):
-        """Membuat string data CSV palsu sesuai pilihan user"""
+        """Membuat sampel palsu sesuai pilihan user"""
         # Format: MQ2, MQ3, MQ4, MQ6, MQ7, MQ8, MQ135, QCM, Temp, Hum, Pres
         
-        data = []
+        data = np.zeros(NUM_VALUES, dtype=np.float64)
         is_bio = self.rb_biomarker.isChecked()
         
         # Generate 8 Sensor Gas + QCM
@@ -108,66 +223,35 @@ class DeviceControlWidget(QWidget):
                 base = 50.0
             
             # Tambah noise random dikit biar grafik goyang
-            val = base + random.uniform(-5, 5)
-            data.append(f"{val:.2f}")
+            data[i] = base + random.uniform(-5, 5)
             
         # Generate Environment (Temp, Hum, Pres)
-        data.append(f"{28.0 + random.uniform(-0.5, 0.5):.1f}") # Temp
-        data.append(f"{60.0 + random.uniform(-2, 2):.1f}")    # Hum
-        data.append(f"{1005.0 + random.uniform(-1, 1):.1f}")  # Pres
+        data[8] = 28.0 + random.uniform(-0.5, 0.5) # Temp
+        data[9] = 60.0 + random.uniform(-2, 2)     # Hum
+        data[10] = 1005.0 + random.uniform(-1, 1)  # Pres
         
-        data_str = ",".join(data)
-        self.data_received.emit(data_str)
+        self.samples_received.emit(SIMULATION_DEVICE, np.array([time.monotonic()]), data[np.newaxis, :])
 
-    def scan_and_connect(self):
-        if self.is_simulation: return # Jangan scan kalau lagi simulasi
-        
-        if self.is_connected or self.is_connecting: 
-            return
-            
-        # print(f"DEBUG (DeviceControl): Scanning for ports...") 
-        ports = get_available_ports()
-        # print(f"DEBUG (DeviceControl): Available ports: {ports}")
+    def handle_ports_changed(self, ports):
+        if self.is_simulation: return
 
-        if not ports:
+        # Port baru sudah dibuka manager; di sini hanya update label
+        if not ports and not self.manager.workers:
             self.status_label.setText("Hubungkan Perangkat")
             self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #F59E0B;")
-            return
 
-        # If not connected, try to connect to the first available port
-        self.current_port = ports[0]
-        # print(f"DEBUG (DeviceControl): Attempting to connect to: {self.current_port}")
-        
-        self.is_connecting = True 
-        if self.serial_worker:
-            self.serial_worker.stop()
-
-        self.serial_worker = SerialWorker(self.current_port)
-        self.serial_worker.data_received.connect(self.data_received.emit)
-        self.serial_worker.connection_status.connect(self.handle_connection_status)
-        self.serial_worker.error_occurred.connect(self.handle_error_occurred)
-        self.serial_worker.start()
-
-    def handle_connection_status(self, status, message=None):
-        self.is_connected = status
-        self.is_connecting = False
-        
-        if status:
-            self.scan_timer.stop() 
-            self.status_label.setText("Perangkat TERHUBUNG")
-            self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #10B981;") # Green
-        else:
-            if self.serial_worker:
-                self.serial_worker.stop()
-            self.serial_worker = None
-            self.current_port = None
+    def handle_device_connected(self, device):
+        self._refresh_devices()
+        self.connection_status_changed.emit(True, f"{device} terhubung")
+
+    def handle_device_disconnected(self, device, message):
+        self.protocols.pop(device, None)
+        self._refresh_devices()
+        if not self.is_connected:
             self.status_label.setText(message or "Perangkat Terputus")
             self.status_label.setStyleSheet("font-size: 12px; font-weight: bold; color: #EF4444;") # Red
-            
-            if not self.is_simulation:
-                self.scan_timer.start(3000)
-        
-        self.connection_status_changed.emit(status, message)
+        self.connection_status_changed.emit(self.is_connected, f"{device}: {message}")
 
-    def handle_error_occurred(self, error_message):
-        self.handle_connection_status(False, f"Error: {error_message}")
\ No newline at end of file
+    def handle_protocol_selected(self, device, mode):
+        self.protocols[device] = mode
+        self._refresh_devices()
@@ -203,10 +203,30 @@ class GraphWidget(QWidget):
 
     def update_plot(self, graph_values):
         if len(graph_values) != NUM_GRAPH_SENSORS: return
+        self.update_plot_batch([graph_values])
 
+    def update_plot_batch(self, block):
+        """Tambah banyak sampel sekaligus (n x 8), grafik hanya digambar ulang sekali."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[1] != NUM_GRAPH_SENSORS or len(block) == 0: return
+
+        tail = block[-MAX_DATA_POINTS:]
         for i in range(NUM_GRAPH_SENSORS):
-            self.y_data[i].append(graph_values[i])
-            if len(self.y_data[i]) > MAX_DATA_POINTS: self.y_data[i].pop(0)
+            self.y_data[i].extend(tail[:, i].tolist())
+            if len(self.y_data[i]) > MAX_DATA_POINTS: del self.y_data[i][:-MAX_DATA_POINTS]
+
+        self._redraw(block[-1])
+
+    def set_plot_data(self, block):
+        """Ganti seluruh isi grafik dengan `block` (n x 8), misalnya jendela replay yang sudah didesimasi."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[1] != NUM_GRAPH_SENSORS or len(block) == 0: return
+
+        tail = block[-MAX_DATA_POINTS:]
+        self.y_data = [tail[:, i].tolist() for i in range(NUM_GRAPH_SENSORS)]
+        self._redraw(block[-1])
+
+    def _redraw(self, graph_values):
 
         if self.graph_mode == 3:
             # Update Radar Polygon
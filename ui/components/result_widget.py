@@ -192,6 +192,31 @@ class ResultWidget(QWidget):
         self.conf_label.setText(f"Tingkat Keyakinan: {confidence:.0f}%")
         self.progress_bar.hide()
 
+    def set_early_exit_note(self, elapsed_s, saved_s):
+        """Tambahkan info mode adaptif di bawah hasil final."""
+        self.conf_label.setText(f"{self.conf_label.text()}\n⏱️ Selesai {elapsed_s:.0f} s (hemat {saved_s:.0f} s)")
+
+    def set_monitoring_state(self, window, hop):
+        self._style_card("#3B82F6") # Biru
+        self.status_label.setText("MONITORING KONTINU")
+        self.result_label.setText("MENGISI JENDELA")
+        self.conf_label.setText(f"Verdict tiap {hop} sampel (jendela {window} sampel)")
+        self.progress_bar.hide()
+        self.btn_detail.hide()
+
+    def set_live_result(self, label, confidence, details=None, verdict_no=0):
+        """Hasil 1 jendela di mode kontinu (kartu sama dengan set_result, status beda)."""
+        self.set_result(label, confidence, details)
+        self.status_label.setText(f"MONITORING · VERDICT #{verdict_no}")
+
+    def set_processing_state(self):
+        self._style_card("#3B82F6") # Biru
+        self.status_label.setText("MENGHITUNG")
+        self.result_label.setText("VOTING MODEL...")
+        self.conf_label.setText("Menunggu hasil prediksi ensemble")
+        self.progress_bar.hide()
+        self.btn_detail.hide()
+
     def set_cancelled_state(self):
         self._style_card("#F59E0B") # Orange
         self.status_label.setText("DIBATALKAN")
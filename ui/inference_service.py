@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+# ============================================================
+# LAYANAN INFERENSI (DI LUAR THREAD GUI)
+# Prediksi ensemble & tulis database dijalankan di thread pool; hasilnya
+# dikembalikan ke thread GUI lewat sinyal Qt. Setiap submit() mengembalikan
+# InferenceJob yang bisa dibatalkan: job yang belum mulai tidak dijalankan,
+# job yang sedang jalan dibiarkan selesai tapi hasilnya dibuang.
+# ============================================================
+
+
+class InferenceJob:
+    """Future ringan milik InferenceService. Callback dipanggil di thread GUI."""
+
+    def __init__(self, name, on_result=None, on_error=None):
+        self.name = name
+        self.on_result = on_result
+        self.on_error = on_error
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Batalkan job. Callback tidak akan dipanggil lagi."""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def running(self):
+        return self.future is not None and not self.future.done() and not self.cancelled()
+
+    def result(self, timeout=None):
+        """Tunggu hasil (blocking, untuk skrip / test, jangan dipanggil dari thread GUI)."""
+        return self.future.result(timeout)
+
+
+class InferenceService(QObject):
+    """
+    Antrian job inferensi + penulisan database.
+
+      service = InferenceService(parent=self)
+      job = service.submit("prediksi", predictor.predict_vector, vector, whitelist,
+                           on_result=self._on_prediction)
+      ...
+      job.cancel()
+
+    Dua pool terpisah: `workers` thread untuk prediksi (ensemble sendiri sudah
+    paralel per model) dan 1 thread untuk SQLite supaya tulis berurutan.
+    """
+    job_finished = pyqtSignal(object, object) # (job, hasil)
+    job_failed = pyqtSignal(object, str)      # (job, pesan error)
+    _completed = pyqtSignal(object)           # Internal: future selesai (dipancarkan dari thread pool)
+
+    def __init__(self, workers=1, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference-db")
+        # Dari thread pool -> queued ke thread GUI (objek ini hidup di thread GUI).
+        # Selalu queued: callback tidak pernah jalan di dalam submit(), jadi pemanggil
+        # sempat menyimpan job-nya sebelum hasil dikirim.
+        self._completed.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
+
+    def submit(self, name, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Jalankan fn(*args, **kwargs) di pool prediksi."""
+        return self._submit(self._pool, name, fn, args, kwargs, on_result, on_error)
+
+    def submit_db(self, name, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Jalankan fn(*args, **kwargs) di thread database (berurutan)."""
+        return self._submit(self._db_pool, name, fn, args, kwargs, on_result, on_error)
+
+    def _submit(self, pool, name, fn, args, kwargs, on_result, on_error):
+        job = InferenceJob(name, on_result, on_error)
+        job.future = pool.submit(fn, *args, **kwargs)
+        job.future.add_done_callback(lambda _: self._on_future_done(job))
+        return job
+
+    def _on_future_done(self, job):
+        try:
+            self._completed.emit(job)
+        except RuntimeError:
+            pass # Service sudah dihapus (aplikasi ditutup)
+
+    def _deliver(self, job):
+        if job.cancelled():
+            return
+        try:
+            result = job.future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            print(f"DEBUG (InferenceService): Job '{job.name}' gagal: {e}")
+            self.job_failed.emit(job, str(e))
+            if job.on_error is not None:
+                job.on_error(str(e))
+            return
+        self.job_finished.emit(job, result)
+        if job.on_result is not None:
+            job.on_result(result)
+
+    def shutdown(self, wait=False):
+        """Batalkan job yang belum mulai. Tulis database yang sudah diantre tetap diselesaikan."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._db_pool.shutdown(wait=True)
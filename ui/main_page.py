@@ -1,13 +1,20 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QGroupBox, 
-    QSpinBox, QLabel, QFormLayout, QFileDialog, QMessageBox, QInputDialog
+    QSpinBox, QLabel, QFormLayout, QFileDialog, QMessageBox, QInputDialog, QCheckBox,
+    QComboBox, QSlider
 )
 from PyQt6.QtCore import QTimer, pyqtSignal, Qt
 from datetime import datetime
-import pandas as pd
 import os
+import time
 
+from arduino.protocol import format_samples_csv
 from ml.predictor import Predictor
+from ml.session_buffer import SessionBuffer
+from ml.streaming_features import SlidingWindowFeatures
+from ml.early_exit import EarlyExitMonitor
+from ml.packed_dataset import PackedDataset, PACKED_EXT
+from ml.dataset_loader import read_sensor_csv, recording_arrays
 from database.database import create_connection, add_detection_record
 
 from .components.device_control import DeviceControlWidget
@@ -15,21 +22,63 @@ from .components.model_control import ModelControlWidget
 from .components.environment_widget import EnvironmentWidget
 from .components.graph_widget import GraphWidget, NUM_GRAPH_SENSORS
 from .components.result_widget import ResultWidget
+from .inference_service import InferenceService
+from .replay import ReplayTrack, REPLAY_SPEEDS, REPLAY_TICK_MS
 
 # --- Configuration ---
-TOTAL_EXPECTED_VALUES = 11
 # DETECTION_DURATION_MS = 15000 # This is now user-configurable
+MIN_DETECTION_SAMPLES = 10   # Minimal sampel per alat untuk prediksi
+CHECKPOINT_INTERVAL_MS = 1000 # Mode adaptif: buffer dinilai tiap sekian ms
+
+def predict_devices(predictor, vectors, whitelist):
+    """Job InferenceService: voting ensemble untuk vektor fitur tiap alat {device: vektor}."""
+    return {device: predictor.predict_vector(vector, whitelist) for device, vector in vectors.items()}
+
+
+def job_running(job):
+    return job is not None and job.running()
+
+
+def write_detection_record(timestamp, result_string, values):
+    """Job InferenceService (thread database): simpan 1 hasil deteksi + data mentahnya."""
+    raw_data_str = "\\n".join(format_samples_csv(values))
+    conn = create_connection()
+    if not conn:
+        return False
+    try:
+        add_detection_record(conn, timestamp, result_string, raw_data_str)
+    finally:
+        conn.close()
+    return True
+
 
 class MainPage(QWidget):
     record_added = pyqtSignal()
+    # Mode kontinu: (device, timestamp sampel terakhir di jendela, label, confidence) per verdict
+    verdict_ready = pyqtSignal(str, float, str, float)
 
     def __init__(self):
         super().__init__()
         
         # --- State & Core Objects ---
         self.predictor = Predictor()
+        # Prediksi ensemble & tulis database di thread pool (GUI tetap responsif)
+        self.inference = InferenceService(parent=self)
+        self.session_job = None     # Prediksi akhir sesi yang sedang jalan
+        self.csv_job = None         # Prediksi analisis file yang sedang jalan
+        self.checkpoint_job = None  # Mode adaptif
+        self.verdict_jobs = {}      # Mode kontinu: device -> job verdict yang sedang jalan
+        self.pending_windows = {}   # Mode kontinu: device -> (vektor, timestamp) terbaru yang menunggu
         self.is_detecting = False
-        self.data_buffer = []
+        # 1 buffer sampel (n x 11) + timestamp per alat selama deteksi
+        self.session_buffers = {}
+        self.session_results = {}
+        # Mode kontinu: jendela geser per alat + jumlah verdict
+        self.window_features = {}
+        self.verdict_counts = {}
+        # Mode adaptif: monitor early-exit per alat + waktu mulai sesi
+        self.early_exit = {}
+        self.detection_started = None
         
         # --- UI Components ---
         self.device_control = DeviceControlWidget()
@@ -39,6 +88,13 @@ class MainPage(QWidget):
         self.result_widget = ResultWidget()
         self.start_button = QPushButton("Mulai Deteksi")
         self.duration_spinbox = QSpinBox()
+        self.chk_adaptive = QCheckBox("Berhenti Otomatis saat Hasil Sudah Yakin")
+        self.chk_continuous = QCheckBox("Monitoring Kontinu (Jendela Geser)")
+        self.window_spinbox = QSpinBox()
+        self.hop_spinbox = QSpinBox()
+        self.replay_speed = QComboBox()
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal)
+        self.replay_label = QLabel()
         
         self.setup_ui()
         self.connect_signals()
@@ -47,10 +103,19 @@ class MainPage(QWidget):
         self.progress_timer = QTimer(self)
         self.progress_timer.timeout.connect(self._update_progress)
 
+        # Akhir sesi (bisa dihentikan saat batal / early-exit, supaya tidak menembak sesi berikutnya)
+        self.finish_timer = QTimer(self)
+        self.finish_timer.setSingleShot(True)
+        self.finish_timer.timeout.connect(self._finish_detection)
+
+        # Mode adaptif: nilai buffer yang terus bertambah di setiap checkpoint
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.timeout.connect(self._on_checkpoint)
+
         # --- Live Replay Timer ---
         self.replay_timer = QTimer(self)
         self.replay_timer.timeout.connect(self._on_replay_tick)
-        self.replay_data = []
+        self.replay_track = None
         self.replay_index = 0
         self.replay_df = None # Simpan DataFrame asli untuk prediksi akhir
 
@@ -114,11 +179,56 @@ class MainPage(QWidget):
         settings_layout.addWidget(self.duration_spinbox)
         controls_layout.addLayout(settings_layout)
 
+        # Mode adaptif: sesi selesai lebih awal jika voting sudah stabil
+        self.chk_adaptive.setStyleSheet("color: #334155; font-weight: bold;")
+        self.chk_adaptive.setToolTip("Hasil dinilai tiap detik; berhenti jika semua model sepakat "
+                                     "dengan keyakinan tinggi 3x berturut-turut")
+        controls_layout.addWidget(self.chk_adaptive)
+
+        # Mode kontinu: verdict tiap N sampel atas jendela geser (screening di conveyor)
+        self.chk_continuous.setStyleSheet("color: #334155; font-weight: bold;")
+        self.chk_continuous.toggled.connect(self._on_continuous_toggled)
+        controls_layout.addWidget(self.chk_continuous)
+
+        self.continuous_widget = QWidget()
+        continuous_layout = QFormLayout(self.continuous_widget)
+        continuous_layout.setContentsMargins(10, 0, 0, 0)
+        self.window_spinbox.setRange(10, 30000)
+        self.window_spinbox.setValue(500)
+        self.window_spinbox.setSuffix(" sampel")
+        self.hop_spinbox.setRange(1, 30000)
+        self.hop_spinbox.setValue(50)
+        self.hop_spinbox.setSuffix(" sampel")
+        continuous_layout.addRow("Jendela:", self.window_spinbox)
+        continuous_layout.addRow("Verdict tiap:", self.hop_spinbox)
+        self.continuous_widget.setVisible(False)
+        controls_layout.addWidget(self.continuous_widget)
+
         # Tombol Analisis CSV
         self.btn_csv = QPushButton("📂 Analisis File CSV")
         self.btn_csv.clicked.connect(self.analyze_file)
         self.btn_csv.setStyleSheet("background-color: #64748B; color: white; font-weight: bold;")
         controls_layout.addWidget(self.btn_csv)
+
+        # Kecepatan replay file: instan (langsung prediksi) atau Nx, bisa digeser saat diputar
+        replay_layout = QHBoxLayout()
+        self.replay_speed.addItem("Instan", 0)
+        for speed in REPLAY_SPEEDS:
+            self.replay_speed.addItem(f"{speed}x", speed)
+        self.replay_speed.setCurrentIndex(1)
+        replay_layout.addWidget(QLabel("Kecepatan Replay:"))
+        replay_layout.addWidget(self.replay_speed)
+        controls_layout.addLayout(replay_layout)
+
+        self.replay_widget = QWidget()
+        seek_layout = QHBoxLayout(self.replay_widget)
+        seek_layout.setContentsMargins(0, 0, 0, 0)
+        self.replay_slider.valueChanged.connect(self._on_replay_seek)
+        self.replay_label.setStyleSheet("color: #64748B; font-size: 11px;")
+        seek_layout.addWidget(self.replay_slider, 1)
+        seek_layout.addWidget(self.replay_label)
+        self.replay_widget.setVisible(False)
+        controls_layout.addWidget(self.replay_widget)
         
         right_layout.addWidget(controls_box)
         
@@ -149,12 +259,21 @@ class MainPage(QWidget):
 
     def connect_signals(self):
         self.device_control.connection_status_changed.connect(self.on_connection_status_changed)
-        self.device_control.data_received.connect(self.on_data_received)
+        self.device_control.samples_received.connect(self.on_samples_received)
+        self.device_control.active_device_changed.connect(self.on_active_device_changed)
         self.model_control.model_loaded.connect(self.on_model_loaded)
         self.start_button.clicked.connect(self.toggle_detection)
 
+    def _active_buffer(self):
+        """Buffer sesi milik alat yang sedang ditampilkan."""
+        device = self.device_control.active_device()
+        if device in self.session_buffers:
+            return self.session_buffers[device]
+        return next(iter(self.session_buffers.values()), SessionBuffer())
+
     def save_to_dataset(self):
-        if not self.data_buffer:
+        data_buffer = self._active_buffer()
+        if not data_buffer:
             QMessageBox.warning(self, "Kosong", "Tidak ada data buffer untuk disimpan!")
             return
 
@@ -188,12 +307,9 @@ class MainPage(QWidget):
             
             with open(filepath, 'w') as f:
                 f.write(header + "\n")
-                for line in self.data_buffer:
-                    # Ubah koma jadi titik koma (standar CSV kita)
-                    # Dan pastikan angka pakai koma desimal jika perlu, tapi standar kita titik
-                    # Data buffer kita formatnya: "val,val,val" (koma separated, titik decimal)
-                    # Kita ubah jadi ";" separated
-                    f.write(line.replace(',', ';') + "\n")
+                # Standar CSV kita: ";" separated, titik decimal
+                for line in format_samples_csv(data_buffer.values, sep=';'):
+                    f.write(line + "\n")
                     
             QMessageBox.information(self, "Sukses", f"Data berhasil disimpan ke:\n{filepath}")
             self.btn_save_dataset.hide() # Sembunyikan setelah save
@@ -202,16 +318,34 @@ class MainPage(QWidget):
             QMessageBox.critical(self, "Error", f"Gagal menyimpan file: {e}")
 
     def analyze_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Pilih File CSV Data", "", "CSV Files (*.csv);;All Files (*)")
+        # Replay sedang jalan -> tombol berfungsi sebagai "Lewati" (langsung ke hasil)
+        if self.replay_timer.isActive():
+            self._finish_csv_analysis()
+            return
+        # Prediksi file sedang jalan -> tombol berfungsi sebagai "Batalkan"
+        if job_running(self.csv_job):
+            self.csv_job.cancel()
+            self._on_csv_done()
+            self.result_widget.set_cancelled_state()
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Pilih File CSV Data", "",
+            f"CSV Files (*.csv);;Packed Dataset (*{PACKED_EXT});;All Files (*)"
+        )
         
         if not file_path:
             return
 
         try:
-            # Baca CSV
-            df = pd.read_csv(file_path, sep=';', decimal=',')
-            if df.shape[1] < 3: 
-                df = pd.read_csv(file_path, sep=',', decimal='.')
+            if file_path.endswith(PACKED_EXT):
+                # Dataset packed: pilih 1 rekaman dari dalam file
+                df = self._pick_packed_recording(file_path)
+                if df is None:
+                    return
+            else:
+                # Baca CSV (separator ; lalu ,)
+                df = read_sensor_csv(file_path)
             
             if df.empty:
                 QMessageBox.warning(self, "Error", "File kosong atau format salah!")
@@ -222,83 +356,122 @@ class MainPage(QWidget):
             df.columns = df.columns.str.strip().str.upper().str.replace(' ', '')
             
             self.replay_df = df # Simpan untuk prediksi nanti
-            self.replay_data = []
-            
-            # Convert DataFrame ke List of dict untuk iterasi cepat
-            # Kita perlu ekstrak 8 sensor + 3 env (jika ada)
-            sensors = ['MQ2', 'MQ3', 'MQ4', 'MQ6', 'MQ7', 'MQ8', 'MQ135', 'QCM']
-            envs = ['TEMP', 'HUM', 'PRES'] # Asumsi nama kolom environment
-            
-            for _, row in df.iterrows():
-                # Ambil data sensor
-                vals = []
-                for s in sensors:
-                    vals.append(row.get(s, 0.0))
-                
-                # Ambil data env (fallback ke 0 jika gak ada)
-                # Coba berbagai variasi nama kolom env umum
-                t = row.get('TEMP', row.get('TEMPERATURE', row.get('SUHU', 0.0)))
-                h = row.get('HUM', row.get('HUMIDITY', row.get('KELEMBABAN', 0.0)))
-                p = row.get('PRES', row.get('PRESSURE', row.get('TEKANAN', 0.0)))
-                
-                self.replay_data.append({
-                    'sensors': vals,
-                    'env': [t, h, p]
-                })
-
-            # UI State Update
-            self.btn_csv.setEnabled(False)
-            self.btn_csv.setText("⏹ Stop Replay")
-            self.start_button.setEnabled(False)
-            
-            # Reset Grafik
-            self.graph_widget.reset()
-            self.result_widget.reset()
-            self.result_widget.set_collecting_state(len(self.replay_data) * 0.05) # Estimasi waktu visual
-            
-            # Mulai Timer (Speed: 50ms per data point = 20Hz)
+            # 8 sensor + 3 env (Temp/Hum/Pres, termasuk variasi nama kolom) sebagai array
+            self.replay_track = ReplayTrack(*recording_arrays(df))
             self.replay_index = 0
-            self.replay_timer.start(50)
-
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal membaca file:\n{str(e)}")
+            return
+
+        # Reset Grafik
+        self.graph_widget.reset()
+        self.result_widget.reset()
+
+        speed = self.replay_speed.currentData()
+        if not speed:
+            # Mode instan: tampilkan seluruh rekaman sekaligus lalu langsung prediksi
+            self.replay_index = len(self.replay_track)
+            self._show_replay_frame()
+            self._finish_csv_analysis()
+            return
+
+        # UI State Update
+        self.btn_csv.setText("⏭ Lewati Replay")
+        self.start_button.setEnabled(False)
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setRange(0, len(self.replay_track))
+        self.replay_slider.setValue(0)
+        self.replay_slider.blockSignals(False)
+        self.replay_widget.setVisible(True)
+
+        self.result_widget.set_collecting_state(self._replay_remaining_ms() // 1000) # Estimasi waktu visual
+        self.result_widget.set_progress_max(len(self.replay_track))
+        self.replay_timer.start(REPLAY_TICK_MS)
+
+    def _pick_packed_recording(self, file_path):
+        ds = PackedDataset(file_path)
+        if len(ds) == 0:
+            QMessageBox.warning(self, "Error", "Dataset packed tidak berisi rekaman!")
+            return None
+
+        items = [f"{i + 1}. {ds.describe(i)}" for i in range(len(ds))]
+        item, ok = QInputDialog.getItem(self, "Pilih Rekaman", "Rekaman yang akan dianalisis:", items, 0, False)
+        if not ok:
+            return None
+        return ds.to_dataframe(items.index(item))
 
     def _on_replay_tick(self):
-        if self.replay_index >= len(self.replay_data):
+        speed = self.replay_speed.currentData()
+        if not speed or self.replay_index >= len(self.replay_track):
             self._finish_csv_analysis()
             return
 
-        # Ambil data frame saat ini
-        frame = self.replay_data[self.replay_index]
-        
-        # Update UI
-        self.graph_widget.update_plot(frame['sensors'])
-        self.environment_widget.update_values(*frame['env'])
+        # Maju `speed` baris per tick; grafik diambil dari array yang sudah didesimasi
+        self.replay_index = min(self.replay_index + speed, len(self.replay_track))
+        self._show_replay_frame()
+        self.result_widget.update_countdown(self._replay_remaining_ms())
+
+    def _on_replay_seek(self, index):
+        if self.replay_track is None or not self.replay_timer.isActive():
+            return
+        self.replay_index = index
+        self._show_replay_frame()
+
+    def _show_replay_frame(self):
+        track = self.replay_track
+        speed = self.replay_speed.currentData()
+        self.graph_widget.set_plot_data(track.graph_window(self.replay_index, speed) if speed else track.overview)
+        self.environment_widget.update_values(*track.env_at(self.replay_index))
         
         # Update Progress Bar di Result Widget (biar gak diam)
-        self.result_widget.set_progress_value(self.replay_index * 50)
-        
-        self.replay_index += 1
-
-    def _finish_csv_analysis(self):
+        self.result_widget.set_progress_value(self.replay_index)
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setValue(self.replay_index)
+        self.replay_slider.blockSignals(False)
+        self.replay_label.setText(f"{self.replay_index}/{len(track)}")
+
+    def _replay_remaining_ms(self):
+        speed = self.replay_speed.currentData() or 1
+        remaining = len(self.replay_track) - self.replay_index
+        return -(-remaining // speed) * REPLAY_TICK_MS
+
+    def _stop_replay(self):
         self.replay_timer.stop()
+        self.replay_widget.setVisible(False)
         self.btn_csv.setEnabled(True)
         self.btn_csv.setText("📂 Analisis File CSV")
+
+    def _finish_csv_analysis(self):
+        self._stop_replay()
+        if self.csv_job is not None:
+            self.csv_job.cancel()
+
+        # Lakukan Prediksi Final (di thread pool)
+        whitelist = self.model_control.get_voting_whitelist()
+        self.result_widget.set_processing_state()
+        self.btn_csv.setText("⏹ Batalkan Analisis")
+        self.csv_job = self.inference.submit(
+            "analisis file", self.predictor.predict_from_dataframe, self.replay_df, whitelist,
+            on_result=self._on_csv_result, on_error=self._on_csv_error)
         self.update_start_button_state()
 
-        try:
-            # Lakukan Prediksi Final
-            whitelist = self.model_control.get_voting_whitelist()
-            result_label, confidence, details = self.predictor.predict_from_dataframe(self.replay_df, whitelist)
-            
-            # Tampilkan Hasil
-            self.result_widget.set_result(result_label, confidence, details)
-            
-            # Opsional: Tampilkan popup ringkasan
-            # QMessageBox.information(self, "Selesai", f"Replay Selesai.\nHasil: {result_label}")
+    def _on_csv_done(self):
+        self.csv_job = None
+        self.btn_csv.setText("📂 Analisis File CSV")
+        self.update_start_button_state()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal analisis akhir:\n{e}")
+    def _on_csv_error(self, message):
+        self._on_csv_done()
+        self.result_widget.set_insufficient_data_state()
+        QMessageBox.critical(self, "Error", f"Gagal analisis akhir:\n{message}")
+
+    def _on_csv_result(self, result):
+        self._on_csv_done()
+        # Tampilkan Hasil
+        self.result_widget.set_result(*result)
+        
+        # Opsional: Tampilkan popup ringkasan
+        # QMessageBox.information(self, "Selesai", f"Replay Selesai.\nHasil: {result[0]}")
 
     def on_connection_status_changed(self, is_connected, message):
         self.update_start_button_state()
@@ -311,74 +484,162 @@ class MainPage(QWidget):
     def on_model_loaded(self, is_loaded):
         self.update_start_button_state()
 
-    def on_data_received(self, data_string):
-        print(f"DEBUG: Data string received: '{data_string}'") 
-        try:
-            sensor_values = [float(x.strip()) for x in data_string.split(',')]
-            
-            # Toleransi jumlah data:
-            # Jika data kurang dari 11, kita pad dengan 0.
-            # Jika data lebih dari 11, kita potong.
-            if len(sensor_values) < TOTAL_EXPECTED_VALUES:
-                print(f"DEBUG: Data kurang ({len(sensor_values)}), padding dengan 0.")
-                sensor_values.extend([0.0] * (TOTAL_EXPECTED_VALUES - len(sensor_values)))
-            elif len(sensor_values) > TOTAL_EXPECTED_VALUES:
-                print(f"DEBUG: Data berlebih ({len(sensor_values)}), memotong data.")
-                sensor_values = sensor_values[:TOTAL_EXPECTED_VALUES]
-
-            graph_values = sensor_values[:NUM_GRAPH_SENSORS]
-            bme_values = sensor_values[NUM_GRAPH_SENSORS:]
-            
-            # Pastikan bme_values punya minimal 3 data (Temp, Hum, Pres)
-            # Jika tidak ada, isi default 0
-            t = bme_values[0] if len(bme_values) > 0 else 0
-            h = bme_values[1] if len(bme_values) > 1 else 0
-            p = bme_values[2] if len(bme_values) > 2 else 0
-            
-            self.graph_widget.update_plot(graph_values)
-            self.environment_widget.update_values(t, h, p)
-            
-            if self.is_detecting:
-                self.data_buffer.append(data_string)
-
-        except (ValueError, IndexError) as e:
-            print(f"DEBUG: Parsing error in on_data_received for '{data_string}': {e}")
-            pass 
+    def on_samples_received(self, device, timestamps, values):
+        # 1 potongan sampel (n x 11, sudah di-parse di thread serial) -> 1x gambar ulang
+        # Grafik hanya menampilkan alat yang dipilih; semua alat tetap direkam.
+        if device == self.device_control.active_device():
+            self.graph_widget.update_plot_batch(values[:, :NUM_GRAPH_SENSORS])
+            self.environment_widget.update_values(*values[-1, NUM_GRAPH_SENSORS:NUM_GRAPH_SENSORS + 3])
+        
+        if self.is_detecting and self.chk_continuous.isChecked():
+            self._update_window(device, timestamps, values)
+        elif self.is_detecting:
+            if device not in self.session_buffers: # Alat baru tersambung di tengah sesi
+                self.session_buffers[device] = SessionBuffer(track_features=True)
+            self.session_buffers[device].append(timestamps, values)
+
+        # Telemetri: latensi baca serial -> gambar, dan antrian sinyal yang sudah diproses
+        self.device_control.record_paint(device, timestamps)
+
+    def on_active_device_changed(self, device):
+        self.graph_widget.reset()
+        self.environment_widget.reset()
+        if device in self.session_results and self.window_features:
+            self.result_widget.set_live_result(*self.session_results[device], self.verdict_counts.get(device, 0))
+        elif device in self.session_results and not self.is_detecting:
+            self.result_widget.set_result(*self.session_results[device])
 
     def toggle_detection(self):
+        # Prediksi akhir sesi masih berjalan -> tombol berfungsi sebagai "Batalkan"
+        if job_running(self.session_job):
+            self.session_job.cancel()
+            self._on_session_done()
+            self.result_widget.set_cancelled_state()
+            return
+
         # Safety: Matikan Replay jika ada
         if self.replay_timer.isActive():
-            self.replay_timer.stop()
-            self.btn_csv.setEnabled(True)
-            self.btn_csv.setText("📂 Analisis File CSV")
+            self._stop_replay()
 
         if self.is_detecting:
             # --- Cancel Detection ---
             self.is_detecting = False
             self.progress_timer.stop()
+            self.finish_timer.stop()
+            self.checkpoint_timer.stop()
+            self._cancel_background_jobs()
             self.start_button.setText("Mulai Deteksi")
-            self.duration_spinbox.setEnabled(True)
-            self.model_control.setEnabled(True)
+            self._set_settings_enabled(True)
             self.update_start_button_state()
-            self.result_widget.set_cancelled_state()
+            if self.chk_continuous.isChecked():
+                self.window_features = {} # Verdict terakhir tetap ditampilkan
+            else:
+                self.result_widget.set_cancelled_state()
+        elif self.chk_continuous.isChecked():
+            self._start_continuous()
         else:
             # --- Start Detection ---
             self.btn_save_dataset.hide() # Sembunyikan tombol save saat mulai baru
-            self.data_buffer.clear()
             self.is_detecting = True
             
             duration_s = self.duration_spinbox.value()
+            self.session_buffers = {}
+            self.session_results = {}
+            for device in self.device_control.connected_devices():
+                buf = SessionBuffer(track_features=True)
+                buf.reserve_seconds(duration_s) # Alokasi sekali di awal sesi
+                self.session_buffers[device] = buf
             duration_ms = duration_s * 1000
             
             self.start_button.setText("Batalkan")
-            self.duration_spinbox.setEnabled(False)
-            self.model_control.setEnabled(False)
+            self._set_settings_enabled(False)
             
             self.result_widget.set_progress_max(duration_ms)
             self.result_widget.set_collecting_state(duration_s)
             self.progress_timer.start(100) 
             
-            QTimer.singleShot(duration_ms, self._finish_detection)
+            self.detection_started = time.monotonic()
+            self.early_exit = {}
+            if self.chk_adaptive.isChecked():
+                self.checkpoint_timer.start(CHECKPOINT_INTERVAL_MS)
+            self.finish_timer.start(duration_ms)
+
+    def _set_settings_enabled(self, enabled):
+        self.duration_spinbox.setEnabled(enabled and not self.chk_continuous.isChecked())
+        self.chk_adaptive.setEnabled(enabled and not self.chk_continuous.isChecked())
+        self.model_control.setEnabled(enabled)
+        self.chk_continuous.setEnabled(enabled)
+        self.continuous_widget.setEnabled(enabled)
+
+    def _on_continuous_toggled(self, checked):
+        self.continuous_widget.setVisible(checked)
+        self.duration_spinbox.setEnabled(not checked)
+        self.chk_adaptive.setEnabled(not checked)
+
+    # --- Mode Kontinu ---
+    def _start_continuous(self):
+        self.btn_save_dataset.hide()
+        self.is_detecting = True
+        self.session_buffers = {}
+        self.session_results = {}
+        self.window_features = {}
+        self.verdict_counts = {}
+
+        self.start_button.setText("Hentikan Monitoring")
+        self._set_settings_enabled(False)
+        self.result_widget.set_monitoring_state(self.window_spinbox.value(), self.hop_spinbox.value())
+
+    def _update_window(self, device, timestamps, values):
+        wf = self.window_features.get(device)
+        if wf is None:
+            wf = SlidingWindowFeatures(self.window_spinbox.value(), self.hop_spinbox.value())
+            self.window_features[device] = wf
+        vector = wf.update(values)
+        if vector is None:
+            return
+
+        # Beberapa jendela selesai dalam 1 potongan -> hanya jendela terbaru yang dinilai,
+        # supaya verdict tidak tertinggal dari data. Jika prediksi sebelumnya masih jalan,
+        # jendela terbaru menunggu (yang lebih lama ditimpa).
+        self.pending_windows[device] = (vector, float(timestamps[-1]))
+        # Slot job terisi sampai hasilnya DIKIRIM ke thread GUI (bukan sampai future selesai)
+        if device not in self.verdict_jobs:
+            self._submit_verdict(device)
+
+    def _submit_verdict(self, device):
+        vector, timestamp = self.pending_windows.pop(device)
+        whitelist = self.model_control.get_voting_whitelist()
+        job = self.inference.submit(
+            "verdict", self.predictor.predict_vector, vector, whitelist,
+            on_result=lambda result: self._on_verdict(job, device, timestamp, result),
+            on_error=lambda message: self._on_verdict_error(job, device))
+        self.verdict_jobs[device] = job
+
+    def _release_verdict(self, job, device):
+        """Kosongkan slot job verdict; False jika `job` sudah bukan job aktif alat ini."""
+        if self.verdict_jobs.get(device) is not job:
+            return False
+        del self.verdict_jobs[device]
+        return True
+
+    def _on_verdict_error(self, job, device):
+        if self._release_verdict(job, device) and device in self.pending_windows:
+            self._submit_verdict(device)
+
+    def _on_verdict(self, job, device, timestamp, result):
+        if not self._release_verdict(job, device):
+            return
+        if not (self.is_detecting and self.chk_continuous.isChecked()):
+            return
+        result_label, confidence, details = result
+        self.session_results[device] = result
+        self.verdict_counts[device] = self.verdict_counts.get(device, 0) + 1
+        self.verdict_ready.emit(device, timestamp, str(result_label), float(confidence))
+
+        if device == self.device_control.active_device():
+            self.result_widget.set_live_result(result_label, confidence, details, self.verdict_counts[device])
+        if device in self.pending_windows:
+            self._submit_verdict(device)
 
     def _update_progress(self):
         if self.is_detecting:
@@ -391,48 +652,150 @@ class MainPage(QWidget):
             if remaining < 0: remaining = 0
             self.result_widget.update_countdown(remaining)
 
+    def _on_checkpoint(self):
+        """Mode adaptif: nilai fitur streaming tiap alat; akhiri sesi jika semua sudah yakin."""
+        if not self.is_detecting:
+            return
+        buffers = {d: buf for d, buf in self.session_buffers.items() if len(buf) >= MIN_DETECTION_SAMPLES}
+        if not buffers:
+            return
+
+        # Checkpoint sebelumnya belum selesai -> lewati (jangan menumpuk antrian)
+        if self.checkpoint_job is not None:
+            return
+        vectors = {d: buf.features.feature_vector() for d, buf in buffers.items()}
+        # Hanya alat yang sudah mengirim data tapi belum cukup sampel yang menahan sesi.
+        # Port yang terbuka tapi diam (bukan e-nose / belum kirim apa pun) diabaikan.
+        waiting = any(0 < len(buf) < MIN_DETECTION_SAMPLES for buf in self.session_buffers.values())
+        job = self.inference.submit(
+            "checkpoint", predict_devices, self.predictor, vectors, self.model_control.get_voting_whitelist(),
+            on_result=lambda results: self._on_checkpoint_result(job, results, waiting),
+            on_error=lambda message: self._on_checkpoint_error(job))
+        self.checkpoint_job = job
+
+    def _on_checkpoint_error(self, job):
+        if self.checkpoint_job is job:
+            self.checkpoint_job = None
+
+    def _on_checkpoint_result(self, job, results, waiting):
+        # Hasil checkpoint lama (sesi sudah selesai / dibatalkan) dibuang
+        if self.checkpoint_job is not job:
+            return
+        self.checkpoint_job = None
+        if not self.is_detecting:
+            return
+        confident = True
+        for device, result in results.items():
+            self.session_results[device] = result
+            if not self.early_exit.setdefault(device, EarlyExitMonitor()).update(*result):
+                confident = False
+
+        if confident and not waiting:
+            self._finish_detection()
+
     def _finish_detection(self):
         if not self.is_detecting:
             return
             
         self.is_detecting = False
         self.progress_timer.stop()
+        self.finish_timer.stop()
+        self.checkpoint_timer.stop()
+        if self.checkpoint_job is not None:
+            self.checkpoint_job.cancel()
+            self.checkpoint_job = None
+        elapsed = time.monotonic() - self.detection_started
+        saved_s = max(self.duration_spinbox.value() - elapsed, 0.0)
         
-        self.duration_spinbox.setEnabled(True)
-        self.model_control.setEnabled(True)
+        self._set_settings_enabled(True)
         
-        if len(self.data_buffer) < 10: 
+        buffers = {d: buf for d, buf in self.session_buffers.items() if len(buf) >= MIN_DETECTION_SAMPLES}
+        if not buffers:
             self.result_widget.set_insufficient_data_state()
             self.start_button.setText("Mulai Deteksi")
             self.update_start_button_state()
             return
 
-        # --- ENSEMBLE PREDICTION ---
-        # Ambil whitelist dari control panel
+        # --- ENSEMBLE PREDICTION (di thread pool) ---
+        # Vektor fitur streaming sudah siap (diperbarui tiap potongan sampel, tanpa pass
+        # ulang atas buffer); hanya voting model yang dikirim ke InferenceService.
+        # 1 Predictor (model sudah resident) dipakai bergantian untuk semua alat.
         whitelist = self.model_control.get_voting_whitelist()
-        
-        # Kita panggil 'predict_all_models' untuk dapat voting
-        result_label, confidence, details = self.predictor.predict_all_models(self.data_buffer, whitelist)
-        
-        self.result_widget.set_result(result_label, confidence, details)
-        self._save_record(f"{result_label} ({confidence:.0f}%)", self.data_buffer)
-            
+        vectors = {d: buf.features.feature_vector() for d, buf in buffers.items()}
+        early_exit = (elapsed, saved_s) if self.early_exit and saved_s >= 0.5 else None
+
+        self.result_widget.set_processing_state()
+        self.start_button.setText("Batalkan")
+        self.btn_csv.setEnabled(False)
+        self.session_job = self.inference.submit(
+            "prediksi sesi", predict_devices, self.predictor, vectors, whitelist,
+            on_result=lambda results: self._on_detection_result(results, buffers, early_exit),
+            on_error=self._on_session_error)
+
+    def _on_session_done(self):
+        self.session_job = None
         self.start_button.setText("Mulai Deteksi")
+        self.btn_csv.setEnabled(True)
         self.update_start_button_state()
+
+    def _on_detection_result(self, results, buffers, early_exit):
+        self._on_session_done()
+        for device, (result_label, confidence, details) in results.items():
+            self.session_results[device] = (result_label, confidence, details)
+            
+            result_string = f"{result_label} ({confidence:.0f}%)"
+            if len(self.session_buffers) > 1:
+                result_string += f" [{device}]"
+            self._save_record(result_string, buffers[device])
+
+        active = self.device_control.active_device()
+        self.result_widget.set_result(*self.session_results.get(active, next(iter(self.session_results.values()))))
+        if early_exit:
+            elapsed, saved_s = early_exit
+            print(f"⏱️ Early-exit: selesai {elapsed:.1f} s, hemat {saved_s:.1f} s "
+                  f"dari {self.duration_spinbox.value()} s")
+            self.result_widget.set_early_exit_note(elapsed, saved_s)
         
         # Tampilkan tombol Save Dataset
         self.btn_save_dataset.show()
+
+    def _on_session_error(self, message):
+        self._on_session_done()
+        self.result_widget.set_insufficient_data_state()
+        QMessageBox.critical(self, "Error", f"Gagal analisis akhir:\n{message}")
+
+    def _cancel_background_jobs(self):
+        for job in [self.session_job, self.csv_job, self.checkpoint_job, *self.verdict_jobs.values()]:
+            if job is not None:
+                job.cancel()
+        self.session_job = None
+        self.csv_job = None
+        self.checkpoint_job = None
+        self.verdict_jobs = {}
+        self.pending_windows = {}
+
+    def shutdown(self):
+        """Dipanggil saat jendela ditutup: hentikan akuisisi & job inferensi."""
+        self._cancel_background_jobs()
+        self.device_control.shutdown()
+        self.inference.shutdown()
     
     def _save_record(self, result_string, data_buffer):
+        # Format CSV + INSERT SQLite di thread database (bukan thread GUI)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        raw_data_str = "\\n".join(data_buffer)
-        
-        conn = create_connection()
-        if conn:
-            add_detection_record(conn, timestamp, result_string, raw_data_str)
-            conn.close()
+        self.inference.submit_db("simpan riwayat", write_detection_record, timestamp, result_string,
+                                 data_buffer.values, on_result=self._on_record_saved)
+
+    def _on_record_saved(self, saved):
+        if saved:
             self.record_added.emit()
 
     def update_start_button_state(self):
-        can_start = self.predictor.model is not None and self.device_control.is_connected
+        # Prediksi akhir sesi berjalan -> tombol tetap aktif sebagai "Batalkan"
+        if job_running(self.session_job):
+            self.start_button.setEnabled(True)
+            return
+        # Replay / analisis file berjalan -> tidak bisa mulai sesi (batalkan lewat tombol CSV)
+        busy = self.replay_timer.isActive() or job_running(self.csv_job)
+        can_start = self.predictor.model is not None and self.device_control.is_connected and not busy
         self.start_button.setEnabled(can_start)
\ No newline at end of file
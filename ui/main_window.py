@@ -146,7 +146,6 @@ class MainWindow(QMainWindow):
         self.toast.show_message(message, type)
 
     def closeEvent(self, event):
-        if hasattr(self, 'main_page') and hasattr(self.main_page, 'device_control'):
-            if self.main_page.device_control.serial_worker and self.main_page.device_control.serial_worker.isRunning():
-                self.main_page.device_control.serial_worker.stop()
+        if hasattr(self, 'main_page'):
+            self.main_page.shutdown() # Stop semua thread serial & job inferensi
         event.accept()
\ No newline at end of file
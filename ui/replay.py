@@ -0,0 +1,58 @@
+import numpy as np
+
+from .components.graph_widget import MAX_DATA_POINTS
+
+# ============================================================
+# REPLAY FILE CSV
+# Seluruh rekaman sudah berupa array (bukan list dict per baris). Untuk
+# setiap kecepatan, data sensor didesimasi SEKALI saat file dibuka
+# (rata-rata per `speed` baris), jadi setiap tick replay hanya mengambil
+# potongan array untuk grafik, berapa pun kecepatannya.
+# ============================================================
+
+REPLAY_TICK_MS = 50            # 1x = 1 baris per tick (20 baris/detik, kecepatan replay lama)
+REPLAY_SPEEDS = [1, 5, 20, 100] # Kelipatan kecepatan yang bisa dipilih (0 = instan)
+
+
+def block_means(values, factor):
+    """Rata-rata tiap `factor` baris (baris sisa di akhir jadi 1 titik sendiri)."""
+    values = np.asarray(values, dtype=np.float64)
+    if factor <= 1 or len(values) == 0:
+        return values
+    starts = np.arange(0, len(values), factor)
+    counts = np.diff(np.append(starts, len(values)))
+    return np.add.reduceat(values, starts, axis=0) / counts[:, np.newaxis]
+
+
+class ReplayTrack:
+    """
+    Rekaman siap diputar ulang.
+
+      track = ReplayTrack(sensors, env)
+      graph.set_plot_data(track.graph_window(index, speed))
+      env_widget.update_values(*track.env[index])
+
+    Titik grafik ke-j pada kecepatan `speed` = rata-rata baris [j*speed, (j+1)*speed).
+    """
+
+    def __init__(self, sensors, env, speeds=REPLAY_SPEEDS, points=MAX_DATA_POINTS):
+        self.sensors = np.asarray(sensors, dtype=np.float64)
+        self.env = np.asarray(env, dtype=np.float64)
+        self.points = points
+        self.levels = {speed: block_means(self.sensors, speed) for speed in speeds}
+        # Seluruh rekaman dalam <= `points` titik (mode instan)
+        self.overview = block_means(self.sensors, -(-len(self.sensors) // points))
+
+    def __len__(self):
+        return len(self.sensors)
+
+    def graph_window(self, index, speed):
+        """`points` titik terakhir sampai baris `index` (eksklusif) pada kecepatan `speed`."""
+        level = self.levels.get(speed)
+        if level is None:
+            level = self.levels[speed] = block_means(self.sensors, speed)
+        end = min(-(-int(index) // speed), len(level))
+        return level[max(0, end - self.points):end]
+
+    def env_at(self, index):
+        return self.env[min(max(int(index), 1), len(self.env)) - 1]
@@ -9,6 +9,7 @@ import os
 import sys
 import random
 import json
+import glob
 import pandas as pd
 from PyQt6.QtGui import QColor
 from ui.components.graph_widget import GraphWidget
@@ -160,8 +161,10 @@ class TrainingWorker(QThread):
     finished_signal = pyqtSignal(bool, str)
     progress_signal = pyqtSignal(int)
 
-    def __init__(self, selected_models, data_path, active_sensors=None, label_mapping=None, test_size=0.2, random_state=42):
+    def __init__(self, selected_models, data_path, active_sensors=None, label_mapping=None, test_size=0.2, random_state=42, n_workers=None, use_cache=True):
         super().__init__()
+        self.n_workers = n_workers # Jumlah proses paralel untuk baca CSV (None = semua core)
+        self.use_cache = use_cache # Pakai cache fitur (.feature_cache.sqlite) di folder data
         self.selected_models = selected_models
         self.data_path = data_path
         self.active_sensors = active_sensors
@@ -186,7 +189,7 @@ class TrainingWorker(QThread):
             from sklearn.model_selection import train_test_split
             from sklearn.preprocessing import StandardScaler, LabelEncoder
             from sklearn.metrics import accuracy_score, precision_recall_fscore_support
-            from ml.feature_extractor import extract_features
+            from ml.feature_extractor import feature_columns as get_feature_columns
             
             # Import Model-Model
             from sklearn.svm import SVC
@@ -197,97 +200,32 @@ class TrainingWorker(QThread):
             import xgboost as xgb
             
             # --- 1. LOAD DATA (AUTO-DETECT LABELS) ---
-            self.log_signal.emit("\n📊 Membaca Data CSV...")
-            
-            all_features = []
-            all_labels = []
+            self.log_signal.emit("\n📊 Membaca Data...")
             
             if not os.path.exists(self.data_path):
                 self.finished_signal.emit(False, f"Folder data tidak ditemukan: {self.data_path}")
                 return
 
-            subfolders = [f.path for f in os.scandir(self.data_path) if f.is_dir()]
-            if not subfolders:
-                self.log_signal.emit("⚠ Tidak ada subfolder (kelas) ditemukan.")
-                self.finished_signal.emit(False, "Struktur folder salah.")
-                return
-
-            self.log_signal.emit(f"🔎 Ditemukan {len(subfolders)} Kelas Label.")
-            
-            # Hitung total file dulu untuk progress bar
-            total_files = sum([len(glob.glob(os.path.join(f, "*.csv"))) for f in subfolders])
-            processed_files = 0
-            first_file_checked = False # Flag untuk validasi sensor sekali saja
-            
-            for folder_path in subfolders:
-                raw_label_name = os.path.basename(folder_path)
-                
-                # --- APLIKASI LABEL MAPPING (DINAMIS DARI USER) ---
-                final_label_name = self.label_mapping.get(raw_label_name, raw_label_name)
-                
-                csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
-                
-                self.log_signal.emit(f"   📂 {raw_label_name} ➡ Label: '{final_label_name}' ({len(csv_files)} file)")
-                
-                if not csv_files: continue
-
-                for fpath in csv_files:
-                    try:
-                        # Coba baca dengan Separator Titik Koma (;)
-                        df = pd.read_csv(fpath, sep=';', decimal=',')
-                        
-                        # Jika gagal (kolom nyatu), coba Separator Koma (,)
-                        if df.shape[1] < 3:
-                             df_comma = pd.read_csv(fpath, sep=',', decimal='.')
-                             if df_comma.shape[1] >= 3:
-                                 df = df_comma
-                        
-                        if df.shape[1] < 3: continue # Masih gagal -> Skip
-                        
-                        # --- NORMALISASI HEADER (Handle 'MQ 3' vs 'MQ3') ---
-                        # Hapus spasi dan uppercase agar cocok dengan checkbox
-                        df.columns = df.columns.str.strip().str.upper().str.replace(' ', '')
-                        
-                        # --- VALIDASI SENSOR (Hanya Cek File Pertama) ---
-                        if not first_file_checked and self.active_sensors:
-                            # Cek headers di file CSV
-                            file_sensors = df.columns.tolist()
-                            missing_sensors = [s for s in self.active_sensors if s not in file_sensors]
-                            
-                            if missing_sensors:
-                                # ERROR KRITIKAL: Sensor yang diminta tidak ada di file
-                                err_msg = (
-                                    f"❌ <b>VALIDASI DATASET GAGAL!</b><br><br>"
-                                    f"Anda memilih sensor: <b>{', '.join(missing_sensors)}</b><br>"
-                                    f"Tetapi sensor tersebut TIDAK ADA di dalam file dataset.<br><br>"
-                                    f"Sensor yang tersedia di file: <br>{', '.join(file_sensors)}<br><br>"
-                                    f"👉 <i>Silakan perbaiki dataset atau sesuaikan checklist sensor.</i>"
-                                )
-                                self.finished_signal.emit(False, err_msg)
-                                return # STOP TRAINING
-                            
-                            first_file_checked = True # Lolos validasi
-                            
-                        feats = extract_features(df, active_sensors=self.active_sensors)
-                        all_features.append(feats)
-                        all_labels.append(final_label_name) # Pakai label yang sudah di-mapping
-                    except Exception as e: 
-                        pass
-                    
-                    # Update Progress Bar (0% - 50% adalah fase Loading Data)
-                    processed_files += 1
-                    if total_files > 0:
-                        progress = int((processed_files / total_files) * 50) 
-                        self.progress_signal.emit(progress)
+            columns = get_feature_columns(self.active_sensors)
+            packed_files = self._find_fresh_packed()
+            if packed_files:
+                self.log_signal.emit(f"📦 Memakai dataset packed ({len(packed_files)} file).")
+                loaded = self._load_packed_dataset(packed_files, columns)
+            else:
+                loaded = self._load_csv_dataset(columns)
+            if loaded is None:
+                return # Validasi gagal (pesan sudah dikirim)
+            X, all_labels = loaded
             
-            if not all_features:
+            if not all_labels:
                 self.finished_signal.emit(False, "Tidak ada data valid (CSV) ditemukan!")
                 return
             
-            self.log_signal.emit(f"\n✅ Total Dataset: {len(all_features)} Sampel. Mulai Training...")
+            self.log_signal.emit(f"\n✅ Total Dataset: {len(all_labels)} Sampel. Mulai Training...")
 
             # --- 2. PREPROCESSING ---
-            X_df = pd.DataFrame(all_features).fillna(0)
+            # Matriks fitur sudah terisi langsung per baris (tanpa dict per file)
+            X_df = pd.DataFrame(X, columns=columns).fillna(0)
             le = LabelEncoder()
             y = le.fit_transform(all_labels)
             
@@ -370,6 +308,176 @@ class TrainingWorker(QThread):
             self.finished_signal.emit(False, str(e))
 
 
+    def _load_csv_dataset(self, columns):
+        """
+        Fase loading dari folder CSV (1 subfolder = 1 label).
+        Mengembalikan (X, labels), atau None jika training harus dihentikan
+        (finished_signal sudah dikirim).
+        """
+        import numpy as np
+        from ml.dataset_loader import iter_load_recordings, iter_load_recordings_cached, default_workers
+        from ml.feature_cache import FeatureCache
+
+        subfolders = [f.path for f in os.scandir(self.data_path) if f.is_dir()]
+        if not subfolders:
+            self.log_signal.emit("⚠ Tidak ada subfolder (kelas) ditemukan.")
+            self.finished_signal.emit(False, "Struktur folder salah.")
+            return None
+
+        self.log_signal.emit(f"🔎 Ditemukan {len(subfolders)} Kelas Label.")
+        
+        # Kumpulkan semua file dulu (untuk progress bar & pembagian kerja ke pool)
+        file_paths = []
+        file_labels = []
+        for folder_path in subfolders:
+            raw_label_name = os.path.basename(folder_path)
+            
+            # --- APLIKASI LABEL MAPPING (DINAMIS DARI USER) ---
+            final_label_name = self.label_mapping.get(raw_label_name, raw_label_name)
+            
+            csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+            
+            self.log_signal.emit(f"   📂 {raw_label_name} ➡ Label: '{final_label_name}' ({len(csv_files)} file)")
+            
+            file_paths.extend(csv_files)
+            file_labels.extend([final_label_name] * len(csv_files))
+
+        total_files = len(file_paths)
+        workers = min(self.n_workers or default_workers(), max(1, total_files))
+        self.log_signal.emit(f"⚡ Membaca {total_files} file dengan {workers} proses paralel...")
+
+        # Cache fitur di samping dataset: file yang tidak berubah tidak di-extract ulang
+        cache = None
+        if self.use_cache:
+            try:
+                cache = FeatureCache(self.data_path)
+            except Exception as e:
+                self.log_signal.emit(f"⚠ Cache fitur tidak bisa dipakai ({e}), semua file dibaca ulang.")
+
+        X = np.empty((total_files, len(columns)), dtype=np.float64)
+        all_labels = []
+        failed_files = []
+        first_file_checked = False # Flag untuk validasi sensor sekali saja
+        last_progress = -1
+        
+        # Hasil datang SESUAI URUTAN file_paths (baca CSV + ekstraksi fitur di pool)
+        if cache:
+            results = iter_load_recordings_cached(file_paths, cache, self.active_sensors, workers=workers)
+        else:
+            results = iter_load_recordings(file_paths, self.active_sensors, workers=workers)
+        cached_count = 0
+        for processed_files, result in enumerate(results, start=1):
+            if result.get('cached'):
+                cached_count += 1
+            if result['error']:
+                failed_files.append((result['path'], result['error']))
+            else:
+                # --- VALIDASI SENSOR (Hanya Cek File Pertama yang valid) ---
+                if not first_file_checked and self.active_sensors:
+                    file_sensors = result['columns']
+                    missing_sensors = [s for s in self.active_sensors if s not in file_sensors]
+                    
+                    if missing_sensors:
+                        # ERROR KRITIKAL: Sensor yang diminta tidak ada di file
+                        err_msg = (
+                            f"❌ <b>VALIDASI DATASET GAGAL!</b><br><br>"
+                            f"Anda memilih sensor: <b>{', '.join(missing_sensors)}</b><br>"
+                            f"Tetapi sensor tersebut TIDAK ADA di dalam file dataset.<br><br>"
+                            f"Sensor yang tersedia di file: <br>{', '.join(file_sensors)}<br><br>"
+                            f"👉 <i>Silakan perbaiki dataset atau sesuaikan checklist sensor.</i>"
+                        )
+                        results.close() # Hentikan pool
+                        if cache: cache.close()
+                        self.finished_signal.emit(False, err_msg)
+                        return None # STOP TRAINING
+                    
+                    first_file_checked = True # Lolos validasi
+
+                X[len(all_labels)] = result['features']
+                all_labels.append(file_labels[processed_files - 1]) # Pakai label yang sudah di-mapping
+            
+            # Update Progress Bar (0% - 50% adalah fase Loading Data)
+            progress = int((processed_files / total_files) * 50)
+            if progress != last_progress:
+                self.progress_signal.emit(progress)
+                last_progress = progress
+
+        if cache:
+            cache.prune(file_paths)
+            cache.close()
+            self.log_signal.emit(f"💾 Cache fitur: {cached_count} file dari cache, {total_files - cached_count} file diproses ulang.")
+
+        # Laporkan file yang gagal dibaca (jangan ditelan diam-diam)
+        if failed_files:
+            self.log_signal.emit(f"\n⚠ {len(failed_files)} file gagal dibaca & dilewati:")
+            for path, err in failed_files[:20]:
+                self.log_signal.emit(f"   ❌ {os.path.relpath(path, self.data_path)}: {err}")
+            if len(failed_files) > 20:
+                self.log_signal.emit(f"   ... dan {len(failed_files) - 20} file lainnya.")
+
+        return X[:len(all_labels)], all_labels
+
+    def _find_fresh_packed(self):
+        """
+        Cari file dataset packed (.enpk) di folder data.
+        Diabaikan (pakai CSV) jika isi folder CSV tidak sama dengan yang tercatat
+        di file packed: CSV baru, dihapus, dipindah folder (label), atau berubah.
+        """
+        from ml.packed_dataset import find_packed_files, packed_stale_reason
+
+        packed_files = find_packed_files(self.data_path)
+        if not packed_files or os.path.isfile(self.data_path):
+            return packed_files
+
+        reason = packed_stale_reason(packed_files, self.data_path)
+        if reason:
+            self.log_signal.emit(f"⚠ Dataset packed (.enpk) tidak sesuai folder CSV ({reason}), memakai CSV. "
+                                 "Jalankan ulang pack_dataset.py.")
+            return []
+        return packed_files
+
+    def _load_packed_dataset(self, packed_files, columns):
+        """Fase loading dari file dataset packed (.enpk) -> (X, labels) atau None."""
+        import numpy as np
+        from ml.packed_dataset import PackedDataset
+
+        datasets = [PackedDataset(p) for p in packed_files]
+        total_recordings = sum(len(ds) for ds in datasets) or 1
+        done_before = 0
+
+        X_parts = []
+        all_labels = []
+        for packed_path, ds in zip(packed_files, datasets):
+            self.log_signal.emit(f"   📦 {os.path.basename(packed_path)}: {len(ds)} rekaman, channel {', '.join(ds.channels)}")
+
+            # --- VALIDASI SENSOR ---
+            if self.active_sensors:
+                missing_sensors = [s for s, c in zip(self.active_sensors, ds.channel_indices(self.active_sensors)) if c < 0]
+                if missing_sensors:
+                    err_msg = (
+                        f"❌ <b>VALIDASI DATASET GAGAL!</b><br><br>"
+                        f"Anda memilih sensor: <b>{', '.join(missing_sensors)}</b><br>"
+                        f"Tetapi sensor tersebut TIDAK ADA di dalam file dataset.<br><br>"
+                        f"Sensor yang tersedia di file: <br>{', '.join(ds.channels)}<br><br>"
+                        f"👉 <i>Silakan perbaiki dataset atau sesuaikan checklist sensor.</i>"
+                    )
+                    self.finished_signal.emit(False, err_msg)
+                    return None
+
+            # Ekstraksi per potongan dari memory-map: data mentah tidak pernah dimuat semua ke RAM
+            def on_progress(done, _total, base=done_before):
+                self.progress_signal.emit(int(((base + done) / total_recordings) * 50))
+
+            X_part, _ = ds.extract_features(self.active_sensors, progress=on_progress)
+            X_parts.append(X_part)
+            done_before += len(ds)
+            # --- APLIKASI LABEL MAPPING (DINAMIS DARI USER) ---
+            all_labels.extend(self.label_mapping.get(l, l) for l in ds.labels)
+
+        X = np.concatenate(X_parts) if X_parts else np.empty((0, len(columns)))
+        return X, all_labels
+
+
 class TrainingPage(QWidget):
     def __init__(self):
         super().__init__()
@@ -485,6 +593,16 @@ class TrainingPage(QWidget):
         seed_row.addWidget(self.spin_seed)
         layout_params.addLayout(seed_row)
         
+        # Worker Paralel (baca CSV)
+        workers_row = QHBoxLayout()
+        workers_row.addWidget(QLabel("Proses Paralel:"))
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, max(1, os.cpu_count() or 1))
+        self.spin_workers.setValue(max(1, os.cpu_count() or 1))
+        self.spin_workers.setToolTip("Jumlah proses untuk membaca file CSV dataset secara paralel")
+        workers_row.addWidget(self.spin_workers)
+        layout_params.addLayout(workers_row)
+        
         left_layout.addWidget(group_params)
 
         # 3. Sensor Selection
@@ -791,7 +909,8 @@ class TrainingPage(QWidget):
             active_sensors=active_sensors, 
             label_mapping=self.label_mapping,
             test_size=self.test_size,
-            random_state=self.spin_seed.value()
+            random_state=self.spin_seed.value(),
+            n_workers=self.spin_workers.value()
         )
         self.worker.log_signal.connect(self.append_log)
         self.worker.progress_signal.connect(self.progress_bar.setValue)
@@ -0,0 +1,124 @@
+import sys
+import time
+import argparse
+
+from arduino.virtual_device import VirtualDevice, recording_source, synthetic_source, SYNTHETIC_PROFILES
+
+# ============================================================
+# ALAT E-NOSE VIRTUAL (UJI BEBAN TANPA ARDUINO, LINUX/macOS)
+# Contoh:
+#   python virtual_device.py --rate 100 --link /tmp/ttyENOSE0
+#       -> jalankan GUI dengan ENOSE_EXTRA_PORTS=/tmp/ttyENOSE0 python main.py
+#   python virtual_device.py --source sample_data --rate 1000 --corrupt 0.01 --measure 10
+#       -> ukur throughput & drop rate SerialWorker di proses ini (tanpa GUI)
+# ============================================================
+
+
+def measure(dev, seconds, protocol):
+    """Jalankan SerialWorker terhadap alat virtual dan laporkan throughput / sampel hilang."""
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from arduino.serial_worker import SerialWorker
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    worker = SerialWorker(dev.port, protocol=protocol)
+    received = {'samples': 0, 'batches': 0}
+
+    def on_samples(timestamps, values):
+        received['samples'] += len(values)
+        received['batches'] += 1
+        worker.telemetry.record_paint(timestamps)
+
+    # Alat ditahan sampai negosiasi protokol selesai, supaya hitungan kirim/terima sebanding
+    window = {}
+
+    def on_protocol(mode):
+        print(f"🔌 Protokol: {mode}")
+        received['samples'] = received['batches'] = 0
+        window['sent'] = dev.stats['sent']
+        window['start'] = time.monotonic()
+        dev.resume()
+        QTimer.singleShot(int(seconds * 1000), finish)
+
+    def finish():
+        dev.pause()
+        window['sent'] = dev.stats['sent'] - window['sent']
+        window['elapsed'] = time.monotonic() - window['start']
+        QTimer.singleShot(500, app.quit) # Tunggu data yang masih di jalan
+
+    def on_error(message):
+        print(f"❌ {message}")
+        if 'start' not in window:
+            app.quit()
+
+    dev.pause()
+    worker.samples_received.connect(on_samples)
+    worker.error_occurred.connect(on_error)
+    worker.protocol_selected.connect(on_protocol)
+    worker.start()
+    app.exec()
+    worker.stop()
+
+    if 'elapsed' not in window:
+        print("❌ SerialWorker tidak tersambung.")
+        return
+    sent, elapsed = window['sent'], window['elapsed']
+    got = received['samples']
+    lost = max(sent - got, 0)
+    print(f"⏱  {elapsed:.1f} s")
+    print(f"📤 Dikirim   : {sent} sampel ({sent / elapsed:.0f}/s), rusak {dev.stats['corrupted']}, "
+          f"buffer pty penuh {dev.stats['dropped']}")
+    print(f"📥 Diterima  : {got} sampel ({got / elapsed:.0f}/s) dalam {received['batches']} potongan")
+    print(f"📉 Hilang    : {lost} ({100.0 * lost / sent if sent else 0:.2f}%)")
+    if worker.decoder is not None:
+        print(f"🧩 Binary    : CRC gagal {worker.decoder.crc_errors}, gap sequence {worker.decoder.seq_gaps}")
+    snap = worker.telemetry.snapshot()
+    print(f"📈 Telemetri : baris {snap['lines']}, {snap['bytes']} byte, gagal decode {snap['decode_errors']}, "
+          f"gagal parse {snap['parse_errors']}, latensi {snap.get('latency_ms', {})}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alat e-nose virtual di pseudo-terminal.")
+    parser.add_argument("--source", default="bersih",
+                        help="Folder/glob CSV rekaman, atau profil sintetis: " + ", ".join(list(SYNTHETIC_PROFILES) + ['acak']))
+    parser.add_argument("--rate", type=float, default=10.0, help="Sampel per detik")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Jitter jadwal kirim (fraksi periode, mis. 0.2)")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="Peluang sampel rusak (0-1)")
+    parser.add_argument("--disconnect-every", type=float, default=None, help="Putus koneksi tiap N detik")
+    parser.add_argument("--disconnect-for", type=float, default=2.0, help="Lama putus (detik)")
+    parser.add_argument("--ascii-only", action="store_true", help="Tiru firmware lama (tanpa protokol binary)")
+    parser.add_argument("--link", default=None, help="Symlink tetap ke port aktif, mis. /tmp/ttyENOSE0")
+    parser.add_argument("--measure", type=float, default=None, help="Ukur SerialWorker selama N detik lalu keluar")
+    parser.add_argument("--protocol", default="auto", choices=["auto", "ascii", "binary"], help="Protokol SerialWorker saat --measure")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.source in SYNTHETIC_PROFILES or args.source == 'acak':
+        source = synthetic_source(args.source, seed=args.seed)
+    else:
+        source = recording_source(args.source)
+
+    dev = VirtualDevice(source, rate_hz=args.rate, jitter=args.jitter, corrupt_rate=args.corrupt,
+                        disconnect_every=args.disconnect_every, disconnect_for=args.disconnect_for,
+                        binary=not args.ascii_only, link=args.link, seed=args.seed)
+    dev.start()
+    print(f"🧪 Alat virtual aktif di {dev.port}" + (f" (link: {args.link})" if args.link else "")
+          + f" @ {args.rate:g} Hz")
+
+    try:
+        if args.measure:
+            measure(dev, args.measure, args.protocol)
+        else:
+            print(f"   Jalankan GUI dengan: ENOSE_EXTRA_PORTS={args.link or dev.port} python main.py")
+            print("   Ctrl+C untuk berhenti.")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dev.stop()
+        print(f"📊 {dev.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())